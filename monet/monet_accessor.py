@@ -417,7 +417,8 @@ class MONETAccessorPandas:
         df : pandas.DataFrame
             dataframe to be interpolated
         radius_of_influence : float
-            kwarg for pyresample.kd_tree
+            kwarg for pyresample.kd_tree.  Without pyresample the sites are
+            matched with a spherical cKDTree (monet.util.kdtree).
 
         Returns
         -------
@@ -425,10 +426,11 @@ class MONETAccessorPandas:
             Returns the interpolated dataframe
 
         """
+        from .util import kdtree
         d1 = self.rename_for_monet(df)
         d2 = self.rename_for_monet(self._obj)
         # make fake index
-        if has_pyresample:
+        if has_pyresample and kdtree.use_pyresample():
             d1 = self._make_fake_index_var(d1)
             ds1 = self._df_to_da(d1)
             ds2 = self._df_to_da(d2)
@@ -449,15 +451,125 @@ class MONETAccessorPandas:
             result = v.merge(d1, how='left',
                              on='monet_fake_index').drop('monet_fake_index',
                                                          axis=1)
-            if combine:
-                columns_to_use = result.columns.difference(d2.columns)
-                return pd.merge(d2,
-                                result[columns_to_use],
-                                left_index=True,
-                                right_index=True,
-                                how='outer')
-            else:
-                return result
+        else:
+            from numpy import nan
+            iy, ix, valid = kdtree.nearest_index(
+                d1.longitude.values[None, :],
+                d1.latitude.values[None, :],
+                d2.longitude.values,
+                d2.latitude.values,
+                radius_of_influence=radius_of_influence)
+            result = d1.iloc[ix].reset_index(drop=True)
+            result.loc[~valid, :] = nan
+            result.index = d2.index
+        if combine:
+            columns_to_use = result.columns.difference(d2.columns)
+            return pd.merge(d2,
+                            result[columns_to_use],
+                            left_index=True,
+                            right_index=True,
+                            how='outer')
+        else:
+            return result
+
+    def colocate(self,
+                 other,
+                 radius=None,
+                 k=None,
+                 suffix='_other',
+                 distance='distance',
+                 return_index=False):
+        """Co-locates the sites of self with the sites of another network.
+
+        Pairs are found with a spherical cKDTree (monet.util.kdtree) and
+        joined positionally, without going through xarray.
+
+        Parameters
+        ----------
+        other : pandas.DataFrame
+            the other network with latitude and longitude columns.
+        radius : float
+            maximum distance in meters.  Without `k`, all the sites of
+            `other` within `radius` are matched.
+        k : int
+            number of nearest sites of `other` matched to each site.  Defaults
+            to 1 when `radius` is None.
+        suffix : str
+            suffix of the columns of `other` that are also in self.
+        distance : str
+            name of the distance (m) column.
+        return_index : bool
+            return the (i, j, distance) arrays instead of the joined frame.
+
+        Returns
+        -------
+        pandas.DataFrame
+            one row per pair with the columns of self, the columns of `other`
+            and the distance.  Sites without a match are dropped.
+
+        """
+        from .util import kdtree
+        d1 = self.rename_for_monet(self._obj)
+        d2 = self.rename_for_monet(other)
+        i, j, dist = kdtree.colocate(d1.longitude.values,
+                                     d1.latitude.values,
+                                     d2.longitude.values,
+                                     d2.latitude.values,
+                                     radius=radius,
+                                     k=k)
+        if return_index:
+            return i, j, dist
+        left = d1.iloc[i].reset_index(drop=True)
+        right = d2.iloc[j].reset_index(drop=True)
+        right.columns = [
+            c + suffix if c in left.columns else c for c in right.columns
+        ]
+        out = pd.concat([left, right], axis=1)
+        out[distance] = dist
+        return out
+
+    def classify_regions(self, regions, column='region'):
+        """Adds the region of each row as a categorical column.
+
+        Parameters
+        ----------
+        regions : monet.util.regions.RegionSet
+            polygon regions (ie RegionSet.from_geojson('states.geojson')).
+        column : str
+            name of the new column.
+
+        Returns
+        -------
+        pandas.DataFrame
+            copy of the DataFrame with the region column, NaN outside of the
+            regions.
+
+        """
+        from .util.regions import classify_df
+        return classify_df(self.rename_for_monet(self._obj),
+                           regions,
+                           column=column)
+
+    def aggregate_to_grid(self, grid, **kwargs):
+        """Aggregates dense site observations to the cells of a model grid.
+
+        Parameters
+        ----------
+        grid : xarray.DataArray or xarray.Dataset
+            model object with latitude and longitude.
+        **kwargs : dict
+            passed to monet.util.combinetool.aggregate_sites_to_grid (ie how,
+            columns or max_distance).
+
+        Returns
+        -------
+        pandas.DataFrame
+            one row per (cell, time) located at the cell centers.
+
+        """
+        from .util.combinetool import aggregate_sites_to_grid
+        df = self.rename_for_monet(self._obj)
+        return aggregate_sites_to_grid(df, _dataset_to_monet(grid), **kwargs)
 
     def cftime_to_datetime64(self, col=None):
         """Short summary.
@@ -536,6 +648,87 @@ class MONETAccessor(object):
         """
         self._obj = xray_obj
 
+    def column_integrate(self, **kwargs):
+        """Integrates the DataArray over the vertical.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            kwargs for monet.util.column.column_integrate (ie
+            interface_pressure, interface_height, units, out_units, dim).
+
+        Returns
+        -------
+        xarray.DataArray
+            the column with the units in attrs['units'].
+
+        """
+        from .util.column import column_integrate
+        return column_integrate(self._obj, **kwargs)
+
+    def combine_swath(self, swath, **kwargs):
+        """Samples self at each pixel of a satellite swath at the pixel time.
+
+        Parameters
+        ----------
+        swath : xarray.Dataset or xarray.DataArray
+            satellite granule with latitude, longitude and a per pixel or
+            scanline `time`.
+        **kwargs : dict
+            kwargs for monet.util.combinetool.combine_da_to_swath (ie
+            time_interp, variables, max_distance).
+
+        Returns
+        -------
+        xarray.Dataset or xarray.DataArray
+            the model swath co-located with the retrieval.
+
+        """
+        from .util.combinetool import combine_da_to_swath
+        da = _dataset_to_monet(self._obj)
+        return combine_da_to_swath(da, swath, **kwargs)
+
+    def classify_regions(self, regions, cache=True):
+        """Region of each grid cell center.
+
+        Parameters
+        ----------
+        regions : monet.util.regions.RegionSet
+            polygon regions.
+        cache : bool
+            reuse the cell to region map computed before for this grid.
+
+        Returns
+        -------
+        xarray.DataArray
+            integer (y, x) region codes, -1 outside of the regions.
+
+        """
+        return regions.rasterize(_dataset_to_monet(self._obj), cache=cache)
+
+    def bin_swaths(self, granules, variable, **kwargs):
+        """Bins (superobs) satellite swath granules onto the grid of self.
+
+        Parameters
+        ----------
+        granules : xarray.Dataset or iterable of xarray.Dataset
+            swath granules with latitude, longitude, `variable` and optionally
+            a per pixel or scanline `time`.
+        variable : str
+            name of the swath variable to bin.
+        **kwargs : dict
+            kwargs for monet.util.superob.swath_to_grid (ie times, stats,
+            weights).
+
+        Returns
+        -------
+        xarray.Dataset
+            (time, y, x) Dataset of the binned statistics.
+
+        """
+        from .util.superob import swath_to_grid
+        return swath_to_grid(self._obj, granules, variable, **kwargs)
+
     def wrap_longitudes(self, lon_name='longitude'):
         """Ensures longitudes are from -180 -> 180
 
@@ -879,6 +1072,7 @@ class MONETAccessor(object):
 
     def nearest_ij(self, lat=None, lon=None, **kwargs):
         """Uses pyresample to intepolate to find the i, j index of grid with respect to the given lat lon.
+        Falls back to a spherical scipy cKDTree without pyresample.
 
         Parameters
         ----------
@@ -902,7 +1096,7 @@ class MONETAccessor(object):
             has_pyresample = True
         except ImportError:
             has_pyresample = False
-            print('requires pyresample to be installed')
+        from .util import kdtree
 
         try:
             if lat is None or lon is None:
@@ -910,7 +1104,7 @@ class MONETAccessor(object):
         except RuntimeError:
             print('Must provide latitude and longitude')
 
-        if has_pyresample:
+        if has_pyresample and kdtree.use_pyresample():
             dset = _dataset_to_monet(self._obj)
             lons, lats = utils.check_and_wrap(dset.longitude.values,
                                               dset.latitude.values)
@@ -920,6 +1114,12 @@ class MONETAccessor(object):
                 swath, pswath, float(1e6))
             y, x = row[0][0], col[0][0]
             return x, y
+        else:
+            dset = _dataset_to_monet(self._obj)
+            y, x, _ = kdtree.nearest_index(dset.longitude.values,
+                                           dset.latitude.values, float(lon),
+                                           float(lat))
+            return int(x), int(y)
 
     def nearest_latlon(self,
                        lat=None,
@@ -936,6 +1136,9 @@ class MONETAccessor(object):
             Description of parameter `lat`.
         lon : type
             Description of parameter `lon`.
+        esmf : bool
+            Without pyresample, use xesmf instead of the nearest cell from
+            the spherical cKDTree (monet.util.kdtree).
         **kwargs : type
             Description of parameter `**kwargs`.
 
@@ -955,6 +1158,7 @@ class MONETAccessor(object):
 
         from .util.interp_util import lonlat_to_xesmf
         from .util.resample import resample_xesmf
+        from .util import kdtree
         try:
             if lat is None or lon is None:
                 raise RuntimeError
@@ -962,7 +1166,7 @@ class MONETAccessor(object):
             print('Must provide latitude and longitude')
 
         d = _dataset_to_monet(self._obj)
-        if has_pyresample:
+        if has_pyresample and kdtree.use_pyresample():
             lons, lats = utils.check_and_wrap(d.longitude.values,
                                               d.latitude.values)
             swath = self._get_CoordinateDefinition(d)
@@ -971,6 +1175,11 @@ class MONETAccessor(object):
                 swath, pswath, **kwargs)
             y, x = row[0][0], col[0][0]
             return d.isel(x=x, y=y)
+        elif not (esmf and has_xesmf):
+            y, x, _ = kdtree.nearest_index(d.longitude.values,
+                                           d.latitude.values, float(lon),
+                                           float(lat))
+            return d.isel(x=int(x), y=int(y))
         elif has_xesmf:
             kwargs = self._check_kwargs_and_set_defaults(**kwargs)
             self._obj = _rename_latlon(self._obj)
@@ -1162,7 +1371,9 @@ class MONETAccessor(object):
     def remap_nearest(self, data, **kwargs):
         """Interpolates from another grid (data) to the current grid of self using pyresample.
             it assumes that the dimensions are ordered in y,x,z per
-        pyresample docs
+        pyresample docs.  Without pyresample (or with
+        monet.util.kdtree.set_nearest_backend('kdtree')) a spherical
+        scipy cKDTree is used instead.
 
         Parameters
         ----------
@@ -1177,15 +1388,15 @@ class MONETAccessor(object):
             resampled object on current grid.
 
         """
-        from pyresample import utils
-        from pyresample import kd_tree
-        from .util import resample
-        # from .grids import get_generic_projection_from_proj4
+        from .util import kdtree
         # check to see if grid is supplied
         d1 = _dataset_to_monet(data)
         # print(d1)
         d2 = _dataset_to_monet(self._obj)
         # print(d2)
+        if not kdtree.use_pyresample():
+            return kdtree.remap_nearest(d1, d2, **kwargs)
+        from pyresample import kd_tree
         source = self._get_CoordinateDefinition(data=d1)
         target = self._get_CoordinateDefinition(data=d2)
         r = kd_tree.XArrayResamplerNN(source, target, **kwargs)
@@ -1238,6 +1449,7 @@ class MONETAccessor(object):
                       data,
                       suffix=None,
                       pyresample=True,
+                      interp='nearest',
                       **kwargs):
         """Short summary.
 
@@ -1249,6 +1461,15 @@ class MONETAccessor(object):
             Description of parameter `col`.
         radius : type
             Description of parameter `radius`.
+        pyresample : bool
+            nearest neighbour pairing (combine_da_to_df).  It uses pyresample
+            when installed and a spherical cKDTree otherwise.  If False,
+            xesmf is used.
+        interp : str
+            'nearest' or 'bilinear'.  'bilinear' uses precomputed four cell
+            stencil weights that are cached per grid and site list.  Only
+            the merge, cache and aggregate kwargs are used with 'bilinear',
+            the nearest neighbour ones (ie radius_of_influence) are ignored.
 
         Returns
         -------
@@ -1256,14 +1477,26 @@ class MONETAccessor(object):
             Description of returned object.
 
         """
-        if has_pyresample:
-            from .util.combinetool import combine_da_to_df
+        from .util.combinetool import (combine_da_to_df,
+                                       combine_da_to_df_bilinear)
         if has_xesmf:
             from .util.combinetool import combine_da_to_df_xesmf
         # point source data
         da = _dataset_to_monet(self._obj)
         if isinstance(data, pd.DataFrame):
-            if has_pyresample and pyresample:
+            if interp == 'bilinear':
+                # the nearest neighbour kwargs (ie radius_of_influence) do
+                # not apply to the stencil
+                kwargs = {
+                    k: v
+                    for k, v in kwargs.items()
+                    if k in ['merge', 'cache', 'aggregate']
+                }
+                return combine_da_to_df_bilinear(da,
+                                                 data,
+                                                 suffix=suffix,
+                                                 **kwargs)
+            elif pyresample or not has_xesmf:
                 return combine_da_to_df(da, data, **kwargs)
             else:  # xesmf resample
                 return combine_da_to_df_xesmf(da,
@@ -1465,6 +1698,9 @@ class MONETAccessorDataset(object):
 
     def remap_nearest(self, data, radius_of_influence=1e6):
         """Will remap data to the current dataset using the pyresample.kd_tree nearest neighbor interpolation.
+        Without pyresample (or with
+        monet.util.kdtree.set_nearest_backend('kdtree')) a spherical scipy
+        cKDTree is used instead.
 
         Parameters
         ----------
@@ -1478,10 +1714,7 @@ class MONETAccessorDataset(object):
         xarray.Dataset or xarray.DataArray
             The interpolated xarray object
         """
-        from pyresample import utils
-        from pyresample import kd_tree
-        from .util import resample
-        # from .grids import get_generic_projection_from_proj4
+        from .util import kdtree
         # check to see if grid is supplied
         try:
             check_error = False
@@ -1495,6 +1728,10 @@ class MONETAccessorDataset(object):
             print('data must be either an Xarray.DataArray or Xarray.Dataset')
         d1 = _dataset_to_monet(data)
         d2 = _dataset_to_monet(self._obj)
+        if not kdtree.use_pyresample():
+            return kdtree.remap_nearest(
+                d1, d2, radius_of_influence=radius_of_influence)
+        from pyresample import kd_tree
         source = self._get_CoordinateDefinition(d1)
         target = self._get_CoordinateDefinition(d2)
         r = kd_tree.XArrayResamplerNN(source,
@@ -1520,6 +1757,7 @@ class MONETAccessorDataset(object):
 
     def nearest_ij(self, lat=None, lon=None, **kwargs):
         """Uses pyresample to intepolate to find the i, j index of grid with respect to the given lat lon.
+        Falls back to a spherical scipy cKDTree without pyresample.
 
         Parameters
         ----------
@@ -1541,16 +1779,16 @@ class MONETAccessorDataset(object):
             has_pyresample = True
         except ImportError:
             has_pyresample = False
-            print('requires pyresample to be installed')
         from .util.interp_util import nearest_point_swathdefinition as npsd
         from .util.interp_util import lonlat_to_swathdefinition as llsd
+        from .util import kdtree
         try:
             if lat is None or lon is None:
                 raise RuntimeError
         except RuntimeError:
             print('Must provide latitude and longitude')
 
-        if has_pyresample:
+        if has_pyresample and kdtree.use_pyresample():
             dset = _dataset_to_monet(self._obj)
             lons, lats = utils.check_and_wrap(dset.longitude.values,
                                               dset.latitude.values)
@@ -1560,6 +1798,12 @@ class MONETAccessorDataset(object):
                 swath, pswath, float(1e6))
             y, x = row[0][0], col[0][0]
             return x, y
+        else:
+            dset = _dataset_to_monet(self._obj)
+            y, x, _ = kdtree.nearest_index(dset.longitude.values,
+                                           dset.latitude.values, float(lon),
+                                           float(lat))
+            return int(x), int(y)
 
     def nearest_latlon(self,
                        lat=None,
@@ -1576,6 +1820,9 @@ class MONETAccessorDataset(object):
             Description of parameter `lat`.
         lon : type
             Description of parameter `lon`.
+        esmf : bool
+            Without pyresample, use xesmf instead of the nearest cell from
+            the spherical cKDTree (monet.util.kdtree).
         **kwargs : type
             Description of parameter `**kwargs`.
 
@@ -1595,6 +1842,7 @@ class MONETAccessorDataset(object):
 
         from .util.interp_util import lonlat_to_xesmf
         from .util.resample import resample_xesmf
+        from .util import kdtree
         try:
             if lat is None or lon is None:
                 raise RuntimeError
@@ -1602,7 +1850,7 @@ class MONETAccessorDataset(object):
             print('Must provide latitude and longitude')
 
         # d = _dataset_to_monet(self._obj)
-        if has_pyresample:
+        if has_pyresample and kdtree.use_pyresample():
             dset = _dataset_to_monet(self._obj)
             # print(dset)
             lons, lats = utils.check_and_wrap(dset.longitude.values,
@@ -1613,6 +1861,12 @@ class MONETAccessorDataset(object):
                 swath, pswath, float(1e6))
             y, x = row[0][0], col[0][0]
             return dset.isel(x=x).isel(y=y)
+        elif not (esmf and has_xesmf):
+            dset = _dataset_to_monet(self._obj)
+            y, x, _ = kdtree.nearest_index(dset.longitude.values,
+                                           dset.latitude.values, float(lon),
+                                           float(lat))
+            return dset.isel(x=int(x)).isel(y=int(y))
         elif has_xesmf:
             kwargs = self._check_kwargs_and_set_defaults(**kwargs)
             self._obj = _rename_latlon(self._obj)
@@ -1767,6 +2021,29 @@ class MONETAccessorDataset(object):
             dset[i] = self._obj[i].stratify(levels, vertical, axis=axis)
         return dset
 
+    def remap_vertical(self, levels, vertical, **kwargs):
+        """Remaps all variables on model levels to fixed levels (ie from
+        hybrid levels to pressure levels) with one set of weights.
+
+        Parameters
+        ----------
+        levels : array-like
+            target levels in the units of `vertical`.
+        vertical : str or xarray.DataArray
+            vertical coordinate on the model levels (ie 3D pressure).
+        **kwargs : dict
+            kwargs for monet.util.resample.remap_vertical (ie dim, new_dim,
+            log, extrapolate).
+
+        Returns
+        -------
+        xarray.Dataset
+            Dataset on the target levels.
+
+        """
+        from .util.resample import remap_vertical
+        return remap_vertical(self._obj, vertical, levels, **kwargs)
+
     def window(self, lat_min, lon_min, lat_max, lon_max):
         """Function to window, ie select a specific region, given the lower left
         latitude and longitude and the upper right latitude and longitude
@@ -1840,6 +2117,7 @@ class MONETAccessorDataset(object):
                       data,
                       suffix=None,
                       pyresample=True,
+                      interp='nearest',
                       **kwargs):
         """Short summary.
 
@@ -1851,6 +2129,15 @@ class MONETAccessorDataset(object):
             Description of parameter `col`.
         radius : type
             Description of parameter `radius`.
+        pyresample : bool
+            nearest neighbour pairing (combine_da_to_df).  It uses pyresample
+            when installed and a spherical cKDTree otherwise.  If False,
+            xesmf is used.
+        interp : str
+            'nearest' or 'bilinear'.  'bilinear' uses precomputed four cell
+            stencil weights that are cached per grid and site list.  Only
+            the merge, cache and aggregate kwargs are used with 'bilinear',
+            the nearest neighbour ones (ie radius_of_influence) are ignored.
 
         Returns
         -------
@@ -1858,14 +2145,26 @@ class MONETAccessorDataset(object):
             Description of returned object.
 
         """
-        if has_pyresample:
-            from .util.combinetool import combine_da_to_df
+        from .util.combinetool import (combine_da_to_df,
+                                       combine_da_to_df_bilinear)
         if has_xesmf:
             from .util.combinetool import combine_da_to_df_xesmf
         # point source data
         da = _dataset_to_monet(self._obj)
         if isinstance(data, pd.DataFrame):
-            if has_pyresample and pyresample:
+            if interp == 'bilinear':
+                # the nearest neighbour kwargs (ie radius_of_influence) do
+                # not apply to the stencil
+                kwargs = {
+                    k: v
+                    for k, v in kwargs.items()
+                    if k in ['merge', 'cache', 'aggregate']
+                }
+                return combine_da_to_df_bilinear(da,
+                                                 data,
+                                                 suffix=suffix,
+                                                 **kwargs)
+            elif pyresample or not has_xesmf:
                 return combine_da_to_df(da, data, **kwargs)
             else:  # xesmf resample
                 return combine_da_to_df_xesmf(da,
@@ -1875,6 +2174,169 @@ class MONETAccessorDataset(object):
         else:
             print('d must be either a pd.DataFrame')
 
+    def column_integrate(self, variables=None, dim='z', **kwargs):
+        """Integrates the variables of the Dataset over the vertical.
+
+        Parameters
+        ----------
+        variables : list of str
+            variables to integrate.  Defaults to all with the `dim` dimension
+            and a units attribute.
+        dim : str
+            vertical dimension.
+        **kwargs : dict
+            kwargs for monet.util.column.column_integrate (ie
+            interface_pressure, interface_height, out_units).
+
+        Returns
+        -------
+        xarray.Dataset
+            the columns with the units in attrs['units'].
+
+        """
+        from .util.column import column_integrate
+        if variables is None:
+            variables = [
+                i for i in self._obj.data_vars
+                if dim in self._obj[i].dims and 'units' in self._obj[i].attrs
+            ]
+        out = xr.Dataset()
+        for i in variables:
+            out[i] = column_integrate(self._obj[i], dim=dim, **kwargs)
+        out.attrs = self._obj.attrs.copy()
+        return out
+
+    def combine_swath(self, swath, **kwargs):
+        """Samples self at each pixel of a satellite swath at the pixel time.
+
+        Parameters
+        ----------
+        swath : xarray.Dataset or xarray.DataArray
+            satellite granule with latitude, longitude and a per pixel or
+            scanline `time`.
+        **kwargs : dict
+            kwargs for monet.util.combinetool.combine_da_to_swath (ie
+            time_interp, variables, max_distance).
+
+        Returns
+        -------
+        xarray.Dataset or xarray.DataArray
+            the model swath co-located with the retrieval.
+
+        """
+        from .util.combinetool import combine_da_to_swath
+        da = _dataset_to_monet(self._obj)
+        return combine_da_to_swath(da, swath, **kwargs)
+
+    def classify_regions(self, regions, cache=True):
+        """Region of each grid cell center.
+
+        Parameters
+        ----------
+        regions : monet.util.regions.RegionSet
+            polygon regions.
+        cache : bool
+            reuse the cell to region map computed before for this grid.
+
+        Returns
+        -------
+        xarray.DataArray
+            integer (y, x) region codes, -1 outside of the regions.
+
+        """
+        return regions.rasterize(_dataset_to_monet(self._obj), cache=cache)
+
+    def bin_swaths(self, granules, variable, **kwargs):
+        """Bins (superobs) satellite swath granules onto the grid of self.
+
+        Parameters
+        ----------
+        granules : xarray.Dataset or iterable of xarray.Dataset
+            swath granules with latitude, longitude, `variable` and optionally
+            a per pixel or scanline `time`.
+        variable : str
+            name of the swath variable to bin.
+        **kwargs : dict
+            kwargs for monet.util.superob.swath_to_grid (ie times, stats,
+            weights).
+
+        Returns
+        -------
+        xarray.Dataset
+            (time, y, x) Dataset of the binned statistics.
+
+        """
+        from .util.superob import swath_to_grid
+        return swath_to_grid(self._obj, granules, variable, **kwargs)
+
+    def stats(self, obs, mod, dim='time', metrics=None):
+        """Maps of the metrics of two variables of self over `dim`.
+
+        Parameters
+        ----------
+        obs : str
+            name of the observed (or reanalysis) variable.
+        mod : str
+            name of the model variable.
+        dim : str or list of str
+            dimensions to reduce.
+        metrics : list of str
+            names of the metrics (see monet.util.stats.moment_metrics and
+            median_metrics).
+
+        Returns
+        -------
+        xarray.Dataset
+            one (lazy for dask inputs) variable per metric with the
+            coordinates of the remaining dimensions.
+
+        """
+        from .util.stats import metric_maps
+        return metric_maps(self._obj[obs],
+                           self._obj[mod],
+                           dim=dim,
+                           metrics=metrics)
+
+    def contingency(self,
+                    obs,
+                    mod,
+                    thresholds,
+                    dim=None,
+                    maxval=None,
+                    scores=True):
+        """Contingency counts and categorical scores of two variables.
+
+        Parameters
+        ----------
+        obs : str
+            name of the observed (or analysis) variable.
+        mod : str
+            name of the forecast variable.
+        thresholds : array-like
+            event thresholds (value > threshold).
+        dim : str or list of str
+            dimensions to reduce.  None gives domain totals, 'time' gives
+            per cell maps.
+        maxval : float
+            exclusive upper bound of the events.
+        scores : bool
+            add POD, FAR, SR, POFD, CSI, BIAS, HSS and ETS.
+
+        Returns
+        -------
+        xarray.Dataset
+            counts (and scores) over (threshold, remaining dimensions), lazy
+            for dask inputs.
+
+        """
+        from .util.stats import contingency_maps
+        return contingency_maps(self._obj[obs],
+                                self._obj[mod],
+                                thresholds,
+                                dim=dim,
+                                maxval=maxval,
+                                scores=scores)
+
     def wrap_longitudes(self, lon_name='longitude'):
         """Ensures longitudes are from -180 -> 180
 
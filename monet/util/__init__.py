@@ -2,11 +2,16 @@ import numpy as np
 
 #__name__ = 'util'
 # For backward compatability
-from . import combinetool, interp_util, resample
+from . import (column, combinetool, interp_util, kdtree, nanstats,
+               pairstore, regions, resample, sketch, superob)
 from . import stats as mystats
 from . import tools
+from .tools import get_giorgi_region_bounds, get_giorgi_region_df
 
-__all__ = ['stats', 'tools', 'interp_util', 'resample', 'combinetool']
+__all__ = [
+    'stats', 'tools', 'interp_util', 'resample', 'combinetool', 'pairstore',
+    'superob', 'column', 'kdtree', 'regions', 'sketch', 'nanstats'
+]
 
 
 def nearest(items, pivot):
@@ -126,70 +131,6 @@ def calc_annual_ave(df, col=None):
     return df.merge(df_annual_ave, on=['siteid', 'time_local'])
 
 
-def get_giorgi_region_bounds(index=None, acronym=None):
-    import pandas as pd
-    i = [
-        1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
-        21, 22
-    ]
-    acro = [
-        'NAU', 'SAU', 'AMZ', 'SSA', 'CAM', 'WNA', 'CNA', 'ENA', 'ALA', 'GRL',
-        'MED', 'NEU', 'WAF', 'EAF', 'SAF', 'SAH', 'SEA', 'EAS', 'SAS', 'CAS',
-        'TIB', 'NAS'
-    ]
-    lonmax = [
-        155, 155, -34, -40, -83, -103, -85, -60, -103, -10, 40, 40, 22, 52, 52,
-        65, 155, 145, 100, 75, 100, 180
-    ]
-    lonmin = [
-        110, 110, -82, -76, -116, -130, -103, -85, -170, -103, -10, -10, -20,
-        22, -10, -20, 95, 100, 65, 40, 75, 40
-    ]
-    latmax = [
-        -11, -28, 12, -20, 30, 60, 50, 50, 72, 85, 48, 75, 18, 18, -12, 30, 20,
-        50, 30, 50, 50, 70
-    ]
-    latmin = [
-        -28, -45, -20, -56, 10, 30, 30, 25, 60, 50, 30, 48, -12, -12, -35, 18,
-        -11, 20, 5, 30, 30, 50
-    ]
-    df = pd.DataFrame(
-        {
-            'latmin': latmin,
-            'lonmin': lonmin,
-            'latmax': latmax,
-            'lonmax': lonmax,
-            'acronym': acro
-        },
-        index=i)
-    try:
-        if index is None and acronym is None:
-            print('either index or acronym needs to be supplied')
-            print(
-                'look here https://web.northeastern.edu/sds/web/demsos/images_002/subregions.jpg'
-            )
-            raise ValueError
-        elif index is not None:
-            return df.loc[df.index == index].values.flatten()
-        else:
-            return df.loc[df.acronym == acronym.upper()].values.flatten()
-    except ValueError:
-        exit
-
-
-def get_giorgi_region_df(df):
-    df.loc[:, 'GIORGI_INDEX'] = None
-    df.loc[:, 'GIORGI_ACRO'] = None
-    for i in range(22):
-        latmin, lonmin, latmax, lonmax, acro = get_giorgi_region_bounds(
-            index=int(i + 1))
-        con = (df.longitude <= lonmax) & (df.longitude >= lonmin) & (
-            df.latitude <= latmax) & (df.latitude >= latmin)
-        df.loc[con, 'GIORGI_INDEX'] = i + 1
-        df.loc[con, 'GIORGI_ACRO'] = acro
-    return df
-
-
 def calc_13_category_usda_soil_type(clay, sand, silt):
     """Calculate the 13 category usda soil type from the clay sand and silt
 
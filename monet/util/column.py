@@ -0,0 +1,287 @@
+""" Column operators for comparing model profiles with retrievals """
+import numpy as np
+import xarray as xr
+
+# Avogadro constant (mol-1)
+avogadro = 6.02214076e23
+# molar mass of dry air (kg mol-1)
+molar_mass_air = 0.0289644
+# acceleration of gravity (m s-2)
+g = 9.80665
+# molecules cm-2 in one Dobson unit
+dobson = 2.6867e20 * 1e-4
+
+# mole fraction of the mixing ratio units
+_mole_fraction = {
+    'mol/mol': 1.,
+    'v/v': 1.,
+    'ppm': 1e-6,
+    'ppmv': 1e-6,
+    'ppb': 1e-9,
+    'ppbv': 1e-9,
+    'ppt': 1e-12,
+    'pptv': 1e-12
+}
+# (input units, kind) -> (output units, factor to the output units)
+_column_units = {
+    ('kg/kg', 'pressure'): ('kg/m2', 1. / g),
+    ('ug/m3', 'height'): ('ug/m2', 1.),
+    ('kg/m3', 'height'): ('kg/m2', 1.),
+    ('molecules/cm3', 'height'): ('molecules/cm2', 100.),
+    ('molec/cm3', 'height'): ('molecules/cm2', 100.),
+}
+
+
+def _averaging_kernel(model_profile,
+                      model_pressure,
+                      retrieval_pressure,
+                      averaging_kernel,
+                      prior=None,
+                      extrapolate=True):
+    """NumPy kernel of apply_averaging_kernel on (pixel, level) arrays."""
+    from .resample import apply_vertical_weights, vertical_weights
+    index, weight, valid = vertical_weights(model_pressure,
+                                            retrieval_pressure,
+                                            log=True,
+                                            extrapolate=extrapolate)
+    x = apply_vertical_weights(model_profile, index, weight, valid)
+    ak = np.asarray(averaging_kernel, dtype='float64')
+    if ak.ndim == x.ndim:
+        # column averaging kernel (pixel, level)
+        if prior is None:
+            return np.einsum('...l,...l->...', ak, x)
+        prior = np.asarray(prior, dtype='float64')
+        return prior.sum(axis=-1) + np.einsum('...l,...l->...', ak,
+                                              x - prior)
+    # profile averaging kernel (pixel, level, level)
+    if prior is None:
+        prior = np.zeros_like(x)
+    prior = np.asarray(prior, dtype='float64')
+    return prior + np.einsum('...kl,...l->...k', ak, x - prior)
+
+
+def apply_averaging_kernel(model_profile,
+                           model_pressure,
+                           retrieval_pressure,
+                           averaging_kernel,
+                           prior=None,
+                           extrapolate=True,
+                           level_dim='z',
+                           retrieval_dim='level'):
+    """Applies retrieval averaging kernels to paired model profiles.
+
+    The model profile is interpolated in log pressure to the retrieval
+    pressure grid (batched, see resample.vertical_weights) and weighted by the
+    averaging kernel of each pixel in one vectorized pass.  Two forms are
+    supported:
+
+    * column kernels (pixel, level), ie TROPOMI NO2:
+      ``y = sum(A * x)`` or ``y = sum(xa) + sum(A * (x - xa))`` with a prior.
+    * profile kernels (pixel, level, level), ie IASI or OMI ozone:
+      ``y = xa + A (x - xa)``.
+
+    The model profile must be in the units the kernel expects (ie partial
+    columns on the retrieval layers for TROPOMI).
+
+    Parameters
+    ----------
+    model_profile : numpy.array, dask.array or xarray.DataArray
+        model profile (pixel, model level).
+    model_pressure : numpy.array, dask.array or xarray.DataArray
+        model pressure (pixel, model level).
+    retrieval_pressure : numpy.array, dask.array or xarray.DataArray
+        retrieval pressure grid (pixel, level).
+    averaging_kernel : numpy.array, dask.array or xarray.DataArray
+        (pixel, level) column kernel or (pixel, level, level) profile kernel.
+    prior : numpy.array, dask.array or xarray.DataArray
+        retrieval a priori profile (pixel, level).
+    extrapolate : bool
+        take the nearest model level for retrieval levels outside of the model
+        pressure range.  If False, they are NaN.
+    level_dim : str
+        name of the model level dimension for xarray inputs.
+    retrieval_dim : str
+        name of the retrieval level dimension for xarray inputs.  The second
+        level dimension of a profile kernel is `retrieval_dim` + '_in'.
+
+    Returns
+    -------
+    numpy.array, dask.array or xarray.DataArray
+        smoothed model columns (pixel) or profiles (pixel, level).
+
+    """
+    kwargs = dict(extrapolate=extrapolate)
+    if isinstance(model_profile, xr.DataArray):
+        profile_kernel = averaging_kernel.ndim == model_profile.ndim + 1
+        ak_dims = [retrieval_dim]
+        out_dims = [[]]
+        if profile_kernel:
+            ak_dims = [retrieval_dim, retrieval_dim + '_in']
+            out_dims = [[retrieval_dim]]
+        args = [
+            model_profile, model_pressure, retrieval_pressure,
+            averaging_kernel
+        ]
+        core = [[level_dim], [level_dim], [retrieval_dim], ak_dims]
+        if prior is not None:
+            args.append(prior)
+            core.append([retrieval_dim])
+
+        def _func(x, p, rp, ak, xa=None):
+            return _averaging_kernel(x, p, rp, ak, prior=xa, **kwargs)
+
+        return xr.apply_ufunc(_func,
+                              *args,
+                              input_core_dims=core,
+                              output_core_dims=out_dims,
+                              dask='parallelized',
+                              output_dtypes=[float])
+    if hasattr(model_profile, 'map_blocks'):
+        import dask.array as dsa
+        arrays = [
+            dsa.asarray(i) for i in [
+                model_profile, model_pressure, retrieval_pressure,
+                averaging_kernel
+            ]
+        ]
+        if prior is not None:
+            arrays.append(dsa.asarray(prior))
+        # one chunk along the level axes, the pixels stay chunked
+        pixel_chunks = arrays[0].chunks[0]
+        arrays = [
+            a.rechunk((pixel_chunks, ) + (-1, ) * (a.ndim - 1)) for a in arrays
+        ]
+        profile_kernel = arrays[3].ndim == arrays[0].ndim + 1
+        indices = ['pz', 'pz', 'pl', 'plm' if profile_kernel else 'pl', 'pl']
+        args = []
+        for a, ind in zip(arrays, indices):
+            args.extend([a, ind])
+
+        def _block(x, p, rp, ak, xa=None):
+            return _averaging_kernel(x, p, rp, ak, prior=xa, **kwargs)
+
+        return dsa.blockwise(_block,
+                             'pl' if profile_kernel else 'p',
+                             *args,
+                             concatenate=True,
+                             dtype=float)
+    return _averaging_kernel(model_profile,
+                             model_pressure,
+                             retrieval_pressure,
+                             averaging_kernel,
+                             prior=prior,
+                             **kwargs)
+
+
+def layer_thickness(interface, dim='z'):
+    """Layer thickness from values on the layer interfaces.
+
+    Parameters
+    ----------
+    interface : xarray.DataArray
+        interface pressure (Pa) or height (m) with nz + 1 values along `dim`.
+
+    dim : str
+        vertical dimension.
+
+    Returns
+    -------
+    xarray.DataArray
+        positive thickness with nz values along `dim`.
+
+    """
+    upper = interface.isel({dim: slice(1, None)}).drop_vars(dim,
+                                                             errors='ignore')
+    lower = interface.isel({dim: slice(None, -1)}).drop_vars(dim,
+                                                              errors='ignore')
+    return abs(upper - lower)
+
+
+def _column_factor(units, kind, out_units=None):
+    """Returns the output units and factor of the column integral."""
+    units = units.strip()
+    if kind == 'pressure' and units.lower() in _mole_fraction:
+        # mole fraction * dp / (g * M_air) * N_A -> molecules m-2
+        fac = _mole_fraction[units.lower()] * avogadro / (g * molar_mass_air)
+        fac = fac * 1e-4  # molecules cm-2
+        if out_units is None or out_units == 'molecules/cm2':
+            return 'molecules/cm2', fac
+        elif out_units == 'DU':
+            return 'DU', fac / dobson
+        else:
+            raise ValueError('out_units must be molecules/cm2 or DU')
+    key = (units, kind)
+    if key not in _column_units:
+        raise ValueError('unknown units ' + units + ' for a ' + kind +
+                         ' integral')
+    return _column_units[key]
+
+
+def column_integrate(da,
+                     interface_pressure=None,
+                     interface_height=None,
+                     thickness=None,
+                     units=None,
+                     out_units=None,
+                     dim='z'):
+    """Integrates a concentration profile over the vertical.
+
+    The product with the layer thickness and the sum over `dim` are done in a
+    single contraction (xarray.dot) so no full size temporary is created.
+    Dask backed inputs stay lazy and are reduced per chunk; `dim` is put in a
+    single chunk so a chunk holds whole columns.
+
+    Parameters
+    ----------
+    da : xarray.DataArray
+        concentration on model layers.
+    interface_pressure : xarray.DataArray
+        pressure (Pa) on the nz + 1 layer interfaces.  Used for mixing
+        ratios (ie ppbv or kg/kg).
+    interface_height : xarray.DataArray
+        height (m) on the nz + 1 layer interfaces.  Used for densities (ie
+        ug/m3 or molecules/cm3).
+    thickness : xarray.DataArray
+        layer thickness (Pa or m) if it is already known.  Needs `units`
+        and is treated as pressure thickness if `interface_height` is None.
+    units : str
+        units of `da`.  Defaults to da.attrs['units'].
+    out_units : str
+        'molecules/cm2' (default) or 'DU' for mixing ratios.
+    dim : str
+        vertical dimension.
+
+    Returns
+    -------
+    xarray.DataArray
+        column with the units in attrs['units'].
+
+    """
+    kind = 'pressure'
+    if thickness is None:
+        if interface_pressure is not None:
+            thickness = layer_thickness(interface_pressure, dim=dim)
+        elif interface_height is not None:
+            kind = 'height'
+            thickness = layer_thickness(interface_height, dim=dim)
+        else:
+            raise ValueError('interface_pressure, interface_height or '
+                             'thickness is needed')
+    elif interface_height is not None:
+        kind = 'height'
+    if units is None:
+        units = da.attrs.get('units', None)
+        if units is None:
+            raise ValueError('units must be given when da has no units')
+    out_units, factor = _column_factor(units, kind, out_units=out_units)
+    if da.chunks is not None:
+        da = da.chunk({dim: -1})
+    if thickness.chunks is not None:
+        thickness = thickness.chunk({dim: -1})
+    thickness = thickness.drop_vars(dim, errors='ignore')
+    da = da.drop_vars(dim, errors='ignore')
+    out = xr.dot(da, thickness, dim=dim) * factor
+    out.name = da.name
+    out.attrs = da.attrs.copy()
+    out.attrs['units'] = out_units
+    return out
@@ -3,7 +3,195 @@ from numpy import ones
 from pandas import Series, merge_asof
 
 
-def combine_da_to_df(da, df, merge=True, **kwargs):
+def _model_time_index(model_time, t, window='center'):
+    """Assigns the times `t` to the windows of the model times.
+
+    Parameters
+    ----------
+    model_time : array-like
+        model output times.
+    t : numpy.array
+        datetime64 times to assign.
+    window : str
+        'center', 'left' or 'right' (see aggregate_obs_to_model_time).
+
+    Returns
+    -------
+    tuple
+        (model_time, idx, inside) the sorted unique model times as
+        datetime64[ns], the window index of each time and a boolean array of
+        the times that fall inside a window.
+
+    """
+    from numpy import asarray, diff, searchsorted, sort, unique
+    from pandas import to_datetime
+    mt = sort(unique(asarray(to_datetime(asarray(model_time).ravel()),
+                             dtype='datetime64[ns]')))
+    t = asarray(t, dtype='datetime64[ns]')
+    if window == 'center':
+        edges = mt[:-1] + diff(mt) / 2
+        idx = searchsorted(edges, t, side='right')
+        if len(mt) > 1:
+            inside = (t >= mt[0] - (mt[1] - mt[0]) / 2) & (
+                t < mt[-1] + (mt[-1] - mt[-2]) / 2)
+        else:
+            inside = t == mt[0]
+    elif window == 'left':
+        idx = searchsorted(mt, t, side='right') - 1
+        step = mt[-1] - mt[-2] if len(mt) > 1 else 0
+        inside = (idx >= 0) & (t < mt[-1] + step)
+    elif window == 'right':
+        idx = searchsorted(mt, t, side='left')
+        step = mt[1] - mt[0] if len(mt) > 1 else 0
+        inside = (idx < len(mt)) & (t > mt[0] - step)
+    else:
+        raise ValueError("window must be 'center', 'left' or 'right'")
+    return mt, idx, inside
+
+
+def aggregate_obs_to_model_time(df,
+                                model_time,
+                                how=['mean'],
+                                window='center',
+                                columns=None):
+    """Aggregates sub-hourly observations into the windows of the model times.
+
+    Each observation is assigned to a model time with one vectorized
+    searchsorted and the observations are reduced per (siteid, model time).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        observations with the columns time and siteid.
+    model_time : array-like
+        model output times (ie da.time).
+    how : list of str
+        reductions to apply ('mean', 'median', 'count', 'std', 'min', 'max').
+        The first one is stored under the original column name and the others
+        as `column_reduction` (ie obs_count).
+    window : str
+        'center' windows span half way to the neighbouring model times,
+        'left' windows are [t, t_next) (ie hour averages labelled at the
+        start) and 'right' windows are (t_prev, t].
+    columns : list of str
+        numeric columns to reduce.  Defaults to all numeric columns except
+        latitude and longitude.
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per (siteid, time) with `time` set to the model time.  The
+        latitude and longitude are averaged over the window.
+
+    """
+    from numpy import asarray
+    if isinstance(how, str):
+        how = [how]
+    t = asarray(df['time'].values, dtype='datetime64[ns]')
+    mt, idx, inside = _model_time_index(model_time, t, window=window)
+    dfw = df.loc[inside].copy()
+    dfw['time'] = mt[idx[inside]]
+    if columns is None:
+        columns = [
+            i for i in dfw.select_dtypes('number').columns
+            if i not in ['latitude', 'longitude', 'time']
+        ]
+    agg = {}
+    for col in columns:
+        for n, stat in enumerate(how):
+            name = col if n == 0 else col + '_' + stat
+            agg[name] = (col, stat)
+    for col in ['latitude', 'longitude']:
+        if col in dfw.columns:
+            agg[col] = (col, 'mean')
+    others = [
+        i for i in dfw.columns
+        if i not in columns and i not in agg and i not in ['siteid', 'time']
+    ]
+    for col in others:
+        agg[col] = (col, 'first')
+    out = dfw.groupby(['siteid', 'time'], sort=False,
+                      observed=True).agg(**agg).reset_index()
+    return out
+
+
+def aggregate_sites_to_grid(df,
+                            da,
+                            how=['mean', 'count'],
+                            columns=None,
+                            max_distance=None):
+    """Aggregates the observations of all sites in a model grid cell.
+
+    Each unique site is assigned once to the cell holding it (see
+    superob.grid_cell_index) and the observations are reduced per (cell,
+    time) in one grouped pass.  The result has one pseudo site per cell,
+    located at the cell center, so it can be paired with combine_da_to_df
+    without duplicating model values.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        observations with the columns siteid, latitude, longitude and
+        optionally time.
+    da : xr.DataArray or xr.Dataset
+        monet formatted model object with 2D latitude and longitude.
+    how : list of str
+        reductions to apply ('mean', 'median', 'count', 'std', 'min', 'max').
+        The first one is stored under the original column name and the others
+        as `column_reduction` (ie pm25_count).
+    columns : list of str
+        numeric columns to reduce.  Defaults to all numeric columns except
+        latitude and longitude.
+    max_distance : float
+        maximum site to cell center distance in meters on curvilinear grids.
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per (cell, time) with the columns siteid (the cell as
+        'y_x'), cell, grid_y, grid_x, latitude and longitude of the cell
+        center, nsites (number of sites in the cell) and the reductions.
+
+    """
+    from numpy import asarray, unravel_index
+    from .superob import grid_cell_index
+    if isinstance(how, str):
+        how = [how]
+    lon = asarray(da.longitude.values, dtype='float64')
+    lat = asarray(da.latitude.values, dtype='float64')
+    sites = df.drop_duplicates(subset=['siteid'])
+    cell = grid_cell_index(lon,
+                           lat,
+                           sites.longitude.values,
+                           sites.latitude.values,
+                           max_distance=max_distance)
+    cell = Series(cell, index=sites.siteid.values)
+    dfw = df.assign(cell=df.siteid.map(cell).values)
+    dfw = dfw.loc[dfw.cell >= 0]
+    if columns is None:
+        columns = [
+            i for i in dfw.select_dtypes('number').columns
+            if i not in ['latitude', 'longitude', 'time', 'cell']
+        ]
+    agg = {}
+    for col in columns:
+        for n, stat in enumerate(how):
+            name = col if n == 0 else col + '_' + stat
+            agg[name] = (col, stat)
+    agg['nsites'] = ('siteid', 'nunique')
+    keys = ['cell', 'time'] if 'time' in dfw.columns else ['cell']
+    out = dfw.groupby(keys, sort=True).agg(**agg).reset_index()
+    cells = out.cell.values.astype(int)
+    y, x = unravel_index(cells, lon.shape)
+    out.insert(1, 'grid_y', y)
+    out.insert(2, 'grid_x', x)
+    out['latitude'] = lat.ravel()[cells]
+    out['longitude'] = lon.ravel()[cells]
+    out.insert(0, 'siteid', [str(j) + '_' + str(i) for j, i in zip(y, x)])
+    return out
+
+
+def combine_da_to_df(da, df, merge=True, aggregate=None, **kwargs):
     """This function will combine an xarray data array with spatial information
     point observations in `df`.
 
@@ -17,6 +205,10 @@ def combine_da_to_df(da, df, merge=True, **kwargs):
         Description of parameter `lay`.
     radius : integer or float, default = 12e3
         Description of parameter `radius`.
+    aggregate : list of str
+        If given, the observations are first reduced to the model time windows
+        with these reductions (ie ['mean', 'count']) using
+        aggregate_obs_to_model_time.
 
     Returns
     -------
@@ -24,6 +216,8 @@ def combine_da_to_df(da, df, merge=True, **kwargs):
     """
     from ..util.interp_util import lonlat_to_swathdefinition
     from numpy import ones
+    if aggregate is not None:
+        df = aggregate_obs_to_model_time(df, da.time.values, how=aggregate)
     # try:
     #     if col is None:
     #         raise RuntimeError
@@ -58,6 +252,451 @@ def combine_da_to_df(da, df, merge=True, **kwargs):
         return df_interped
 
 
+def combine_da_to_df_bilinear(da,
+                              df,
+                              merge=True,
+                              suffix=None,
+                              cache=True,
+                              aggregate=None):
+    """Combines an xarray object with point observations in `df` using
+    bilinear interpolation from precomputed stencil weights.
+
+    The four cell stencil and weights of each site are computed once per grid
+    and site list (see interp_util.bilinear_stencil) and applied to all times,
+    levels and variables in a single weighted gather.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted model object.
+    df : pd.DataFrame
+        point observations with the columns time, siteid, latitude and
+        longitude.
+    merge : bool
+        If True, merge the interpolated values into `df`.
+    suffix : str
+        suffix added to model variables already in `df`.  Default '_new'.
+    cache : bool
+        reuse the stencil computed for the same grid and sites.
+    aggregate : list of str
+        If given, the observations are first reduced to the model time windows
+        with these reductions using aggregate_obs_to_model_time.
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    """
+    from ..util.interp_util import apply_bilinear_stencil, bilinear_stencil
+    if suffix is None:
+        suffix = '_new'
+    if aggregate is not None:
+        df = aggregate_obs_to_model_time(df, da.time.values, how=aggregate)
+    dfnn = df.drop_duplicates(subset=['siteid']).dropna(
+        subset=['latitude', 'longitude', 'siteid'])
+    stencil = bilinear_stencil(da.longitude,
+                               da.latitude,
+                               dfnn.longitude.values,
+                               dfnn.latitude.values,
+                               cache=cache)
+    da_interped = apply_bilinear_stencil(da, stencil).compute()
+    if isinstance(da_interped, xr.DataArray):
+        if da_interped.name is None:
+            da_interped.name = 'model'
+        da_interped = da_interped.to_dataset()
+    da_interped.coords['siteid'] = (('site'), dfnn.siteid.values)
+    rename_dict = {}
+    for i in da_interped.data_vars.keys():
+        if i in df.columns:
+            rename_dict[i] = i + suffix
+    da_interped = da_interped.rename(rename_dict)
+    df_interped = da_interped.to_dataframe().reset_index()
+    cols = Series(df_interped.columns)
+    drop_cols = cols.loc[cols.isin(['site', 'x', 'y', 'z'])]
+    df_interped.drop(drop_cols, axis=1, inplace=True)
+    if merge:
+        return df.merge(df_interped, on=['time', 'siteid'], how='left')
+    else:
+        return df_interped
+
+
+def _empty_paired(da, df):
+    """Empty frame with the columns combine_da_to_df gives for `df`."""
+    if isinstance(da, xr.DataArray):
+        names = [da.name]
+    else:
+        names = [
+            i for i in da.data_vars
+            if 'y' in da[i].dims and 'x' in da[i].dims
+        ]
+    extra = [i + '_new' if i in df.columns else i for i in names]
+    return df.iloc[:0].reindex(columns=list(df.columns) + extra)
+
+
+def combine_da_to_df_incremental(da,
+                                 df,
+                                 path,
+                                 network=None,
+                                 lookback=None,
+                                 **kwargs):
+    """Pairs only the observations newer than the watermark of `network` in
+    the paired parquet store at `path` and appends them to the store.
+
+    The watermark is the last time paired for each network.  Observations are
+    only paired up to the last model time so that an hour with observations
+    but no model output yet is paired on a later call.  Rows are deduplicated
+    on (siteid, time) against the new batch and the rows already stored.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted model object.
+    df : pd.DataFrame
+        point observations (ie the rolling window of the network).
+    path : str
+        root directory of the paired parquet store.
+    network : str
+        network name of `df`.  Defaults to the `network` column of `df`.
+    lookback : str or pandas.Timedelta
+        also re-pair the observations within `lookback` of the watermark to
+        pick up late arriving data (ie '3H').  Rows already stored are kept.
+    **kwargs : dict
+        kwargs passed to combine_da_to_df (ie radius_of_influence).
+
+    Returns
+    -------
+    pandas.DataFrame
+        the newly paired rows that were appended to the store.
+
+    """
+    from pandas import Timedelta, Timestamp
+    from .pairstore import (read_paired_keys, read_watermark,
+                            write_paired_parquet, write_watermark)
+    if network is None:
+        if 'network' not in df.columns:
+            raise ValueError('network must be given when df has no network '
+                             'column')
+        network = str(df['network'].iloc[0])
+    watermarks = read_watermark(path)
+    wm = watermarks.get(network)
+    model_end = Timestamp(da.time.values.max())
+    start = None
+    if wm is not None:
+        start = wm
+        if lookback is not None:
+            start = wm - Timedelta(lookback)
+    con = df.time <= model_end
+    if start is not None:
+        con &= df.time > start
+    new_obs = df.loc[con]
+    if new_obs.empty:
+        return _empty_paired(da, new_obs)
+    da_new = da.sel(time=slice(new_obs.time.min(), model_end))
+    paired = combine_da_to_df(da_new, new_obs, merge=True, **kwargs)
+    paired = paired.drop_duplicates(subset=['siteid', 'time'], keep='last')
+    stored = read_paired_keys(path,
+                              start=paired.time.min(),
+                              end=paired.time.max(),
+                              network=network)
+    if len(stored) > 0:
+        keys = paired[['time', 'siteid']].astype({
+            'time': 'datetime64[ns]',
+            'siteid': str
+        })
+        stored = stored.astype({'time': 'datetime64[ns]'}).drop_duplicates()
+        seen = keys.merge(stored,
+                          on=['time', 'siteid'],
+                          how='left',
+                          indicator=True)['_merge'].values == 'both'
+        paired = paired.loc[~seen]
+    if not paired.empty:
+        write_paired_parquet(paired, path, network=network)
+    newest = Timestamp(new_obs.time.max())
+    watermarks[network] = newest if wm is None else max(wm, newest)
+    write_watermark(path, watermarks)
+    return paired
+
+
+_swath_index_cache = {}
+
+
+def combine_da_to_swath(da,
+                        swath,
+                        variables=None,
+                        time_interp='linear',
+                        max_distance=None,
+                        cache=True):
+    """Samples a model at each satellite pixel at the pixel observation time.
+
+    The pixel to cell indices are resolved once per granule geometry (and
+    cached) and the scanline times are bracketed by the model output times.
+    The gather uses xarray vectorized indexing so a dask backed model is only
+    read lazily for the cells and times touched by the granule.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted model object with the dimensions time, y and x.
+    swath : xr.Dataset or xr.DataArray
+        satellite granule with latitude and longitude coordinates and a
+        `time` (per pixel or per scanline) broadcastable to them.
+    variables : list of str
+        model variables to sample.  Defaults to all with time, y and x.
+    time_interp : str
+        'linear' interpolates between the bracketing model times, 'nearest'
+        takes the closest model time.
+    max_distance : float
+        maximum pixel to cell center distance in meters (curvilinear grids).
+    cache : bool
+        reuse the pixel to cell indices computed for the same geometry.
+
+    Returns
+    -------
+    xr.DataArray or xr.Dataset
+        the model swath co-located with the retrieval, with the swath
+        dimensions and coordinates.  Pixels outside the model domain or time
+        range are NaN.
+
+    """
+    from numpy import asarray, clip, rint, searchsorted, where, errstate
+    from .interp_util import _array_key
+    from .superob import grid_cell_index
+    from ..monet_accessor import _rename_to_monet_latlon
+    swath = _rename_to_monet_latlon(swath)
+    lon, lat = xr.broadcast(swath.longitude, swath.latitude)
+    dims = lon.dims
+    key = _array_key(da.longitude.values, da.latitude.values, lon.values,
+                     lat.values)
+    if cache and key in _swath_index_cache:
+        cell = _swath_index_cache[key]
+    else:
+        cell = grid_cell_index(da.longitude.values,
+                               da.latitude.values,
+                               lon.values,
+                               lat.values,
+                               max_distance=max_distance).reshape(lon.shape)
+        if cache:
+            _swath_index_cache[key] = cell
+    nx = da.longitude.shape[-1]
+    valid = cell >= 0
+    cell = where(valid, cell, 0)
+    iy, ix = cell // nx, cell % nx
+    # bracket the pixel times with the model times
+    t = asarray(xr.broadcast(lon, swath['time'])[1].values,
+                dtype='datetime64[ns]')
+    mt = asarray(da.time.values, dtype='datetime64[ns]')
+    nt = len(mt)
+    k0 = clip(searchsorted(mt, t, side='right') - 1, 0, nt - 1)
+    k1 = clip(k0 + 1, 0, nt - 1)
+    dt = mt[k1] - mt[k0]
+    with errstate(divide='ignore', invalid='ignore'):
+        w = where(dt > dt.dtype.type(0), (t - mt[k0]) / dt, 0.)
+    valid &= (t >= mt[0]) & (t <= mt[-1])
+    if time_interp == 'nearest':
+        k0 = where(w > 0.5, k1, k0)
+        w = w * 0.
+    elif time_interp != 'linear':
+        raise ValueError("time_interp must be 'linear' or 'nearest'")
+    if isinstance(da, xr.Dataset):
+        if variables is None:
+            variables = [
+                i for i in da.data_vars
+                if all(d in da[i].dims for d in ['time', 'y', 'x'])
+            ]
+        da = da[variables]
+    da = da.drop_vars(
+        [i for i in ['latitude', 'longitude', 'x', 'y'] if i in da.coords])
+    iy = xr.DataArray(iy, dims=dims)
+    ix = xr.DataArray(ix, dims=dims)
+    lo = da.isel(time=xr.DataArray(k0, dims=dims), y=iy, x=ix)
+    hi = da.isel(time=xr.DataArray(k1, dims=dims), y=iy, x=ix)
+    w = xr.DataArray(w, dims=dims)
+    out = (lo * (1. - w) + hi * w).where(xr.DataArray(valid, dims=dims))
+    if isinstance(da, xr.DataArray):
+        out.name = da.name
+    out.attrs = da.attrs.copy()
+    out.coords['latitude'] = lat
+    out.coords['longitude'] = lon
+    out.coords['time'] = (dims, t)
+    return out
+
+
+def _grid_key(da):
+    """Returns a hashable key describing the horizontal grid of `da`.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted object with 2D latitude and longitude.
+
+    Returns
+    -------
+    tuple
+        (shape, sha1 of longitude, sha1 of latitude)
+
+    """
+    import hashlib
+    from numpy import ascontiguousarray
+    lon = ascontiguousarray(da.longitude.values, dtype='float64')
+    lat = ascontiguousarray(da.latitude.values, dtype='float64')
+    return (lon.shape, hashlib.sha1(lon.tobytes()).hexdigest(),
+            hashlib.sha1(lat.tobytes()).hexdigest())
+
+
+def _nearest_site_index(da, latitude, longitude, radius_of_influence=1e5):
+    """Finds the nearest grid cell of `da` to each site.
+
+    Uses pyresample when installed and the spherical cKDTree of
+    monet.util.kdtree otherwise.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted object with 2D latitude and longitude.
+    latitude : numpy.array
+        site latitudes.
+    longitude : numpy.array
+        site longitudes.
+    radius_of_influence : float
+        maximum distance in meters between a site and a grid cell center.
+
+    Returns
+    -------
+    tuple
+        (iy, ix, valid) integer indices of the nearest cell and a boolean
+        array flagging the sites with a cell inside the radius of influence.
+
+    """
+    from numpy import flatnonzero, unravel_index, zeros
+    from . import kdtree
+    if not kdtree.use_pyresample():
+        return kdtree.nearest_index(da.longitude.values,
+                                    da.latitude.values,
+                                    longitude,
+                                    latitude,
+                                    radius_of_influence=radius_of_influence)
+    from pyresample import kd_tree
+    from pyresample.utils import check_and_wrap
+    from .interp_util import lonlat_to_swathdefinition
+    lons, lats = check_and_wrap(da.longitude.values, da.latitude.values)
+    source = lonlat_to_swathdefinition(longitude=lons, latitude=lats)
+    target = lonlat_to_swathdefinition(longitude=longitude, latitude=latitude)
+    valid_in, valid_out, index_array, _ = kd_tree.get_neighbour_info(
+        source, target, radius_of_influence, neighbours=1)
+    index_array = index_array.ravel()
+    valid_in = flatnonzero(valid_in)
+    # index_array == number of valid inputs means no neighbour was found
+    valid = zeros(len(latitude), dtype=bool)
+    valid[valid_out.ravel()] = index_array < len(valid_in)
+    flat = zeros(len(latitude), dtype=int)
+    flat[valid] = valid_in[index_array[index_array < len(valid_in)]]
+    iy, ix = unravel_index(flat, lons.shape)
+    return iy, ix, valid
+
+
+def _sites_to_wide_frame(da, iy, ix, valid, siteid, name=None, lay=0):
+    """Samples `da` at the cell indices (iy, ix) in one vectorized gather.
+
+    Parameters
+    ----------
+    da : xr.DataArray or xr.Dataset
+        monet formatted model object.
+    iy, ix : numpy.array
+        cell indices for each site.
+    valid : numpy.array
+        boolean flag of sites that have a cell.
+    siteid : numpy.array
+        site ids.
+    name : str
+        model name appended to the variable names (ie O3_cmaq).
+    lay : int
+        layer selected when the object has a z dimension.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame indexed by (time, siteid) with one column per variable.
+
+    """
+    from numpy import nan, repeat, tile
+    from pandas import DataFrame, MultiIndex
+    if isinstance(da, xr.DataArray):
+        da = da.to_dataset(name=da.name)
+    if 'z' in da.dims:
+        da = da.isel(z=lay)
+    points = da.isel(y=xr.DataArray(iy, dims='site'),
+                     x=xr.DataArray(ix, dims='site'))
+    times = points.time.values
+    index = MultiIndex.from_arrays(
+        [repeat(times, len(siteid)),
+         tile(siteid, len(times))],
+        names=['time', 'siteid'])
+    columns = {}
+    for var in points.data_vars:
+        v = points[var]
+        if 'time' not in v.dims or 'site' not in v.dims or v.ndim != 2:
+            continue
+        values = v.transpose('time', 'site').values.astype(float)
+        values[:, ~valid] = nan
+        colname = var if name is None else var + '_' + str(name)
+        columns[colname] = values.ravel()
+    return DataFrame(columns, index=index)
+
+
+def combine_many(models, df, radius_of_influence=1e5, lay=0, merge=True):
+    """Pairs one set of point observations with several models.
+
+    The site locations are resolved once per distinct model grid and every
+    model is sampled with a single vectorized gather.  The model columns are
+    aligned on (time, siteid) in one concatenation and merged with `df` once.
+
+    Parameters
+    ----------
+    models : dict
+        dictionary of {name: xr.DataArray or xr.Dataset}.  The name is
+        appended to each variable name, ie {'cmaq': ds} gives 'O3_cmaq'.
+    df : pd.DataFrame
+        point observations with the columns time, siteid, latitude and
+        longitude.
+    radius_of_influence : float
+        maximum distance in meters between a site and a grid cell center.
+    lay : int
+        layer selected for models with a z dimension.
+    merge : bool
+        If True, merge the model columns into `df`.  If False, return only
+        the wide model frame.
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    """
+    from pandas import concat
+    from ..monet_accessor import _dataset_to_monet
+    dfnn = df.drop_duplicates(subset=['siteid']).dropna(
+        subset=['latitude', 'longitude', 'siteid'])
+    lat = dfnn.latitude.values
+    lon = dfnn.longitude.values
+    siteid = dfnn.siteid.values
+    lookups = {}
+    frames = []
+    for name, da in models.items():
+        da = _dataset_to_monet(da)
+        key = _grid_key(da)
+        if key not in lookups:
+            lookups[key] = _nearest_site_index(
+                da, lat, lon, radius_of_influence=radius_of_influence)
+        iy, ix, valid = lookups[key]
+        frames.append(
+            _sites_to_wide_frame(da, iy, ix, valid, siteid, name=name,
+                                 lay=lay))
+    wide = concat(frames, axis=1, join='outer').reset_index()
+    if merge:
+        return df.merge(wide, on=['time', 'siteid'], how='left')
+    else:
+        return wide
+
+
 def _rename_latlon(ds):
     if 'latitude' in ds.coords:
         return ds.rename({'latitude': 'lat', 'longitude': 'lon'})
@@ -183,3 +183,188 @@ def constant_lon_swathdefition(longitude=None, latitude=None):
     if isinstance(lats, DataArray):
         lons.name = 'lons'
     return geometry.SwathDefinition(lons=lons, lats=lats)
+
+
+_stencil_cache = {}
+
+
+def _array_key(*arrays):
+    """Hashable key of the content of the given arrays."""
+    import hashlib
+    from numpy import ascontiguousarray
+    h = hashlib.sha1()
+    for a in arrays:
+        a = ascontiguousarray(a, dtype='float64')
+        h.update(str(a.shape).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def lonlat_to_xyz(longitude, latitude):
+    """Converts longitude and latitude to unit vectors on the sphere (ECEF).
+
+    Parameters
+    ----------
+    longitude : numpy.array
+        longitude in degrees.
+    latitude : numpy.array
+        latitude in degrees.
+
+    Returns
+    -------
+    numpy.array
+        array of shape (n, 3) of the flattened points.
+
+    """
+    from numpy import asarray, column_stack, cos, deg2rad, sin
+    lon = deg2rad(asarray(longitude, dtype='float64').ravel())
+    lat = deg2rad(asarray(latitude, dtype='float64').ravel())
+    return column_stack([cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat)])
+
+
+def _invert_bilinear(px, py, iterations=8):
+    """Newton inversion of the bilinear map of a quadrilateral at the origin.
+
+    Parameters
+    ----------
+    px, py : numpy.array
+        corner coordinates of shape (..., 4) ordered (0, 0), (1, 0), (1, 1),
+        (0, 1) relative to the target point.
+
+    Returns
+    -------
+    tuple
+        (s, t) fractional position of the origin inside each quadrilateral.
+
+    """
+    from numpy import full, errstate
+    ax, bx = px[..., 0], px[..., 1] - px[..., 0]
+    cx = px[..., 3] - px[..., 0]
+    dx = px[..., 0] - px[..., 1] + px[..., 2] - px[..., 3]
+    ay, by = py[..., 0], py[..., 1] - py[..., 0]
+    cy = py[..., 3] - py[..., 0]
+    dy = py[..., 0] - py[..., 1] + py[..., 2] - py[..., 3]
+    s = full(ax.shape, 0.5)
+    t = full(ax.shape, 0.5)
+    with errstate(divide='ignore', invalid='ignore'):
+        for _ in range(iterations):
+            fx = ax + bx * s + cx * t + dx * s * t
+            fy = ay + by * s + cy * t + dy * s * t
+            j11, j12 = bx + dx * t, cx + dx * s
+            j21, j22 = by + dy * t, cy + dy * s
+            det = j11 * j22 - j12 * j21
+            s = s - (j22 * fx - j12 * fy) / det
+            t = t - (j11 * fy - j21 * fx) / det
+    return s, t
+
+
+def bilinear_stencil(longitude, latitude, site_lon, site_lat, cache=True):
+    """Computes the four cell stencil and bilinear weights of each site on a
+    (curvilinear) grid.
+
+    The nearest cell center is found with a KD-tree on the unit sphere and the
+    site is located in one of the four quadrilaterals sharing that center by
+    inverting the bilinear map.  Results are cached per grid and site list.
+
+    Parameters
+    ----------
+    longitude : 2d numpy.array or xarray.DataArray
+        grid longitudes (y, x).
+    latitude : 2d numpy.array or xarray.DataArray
+        grid latitudes (y, x).
+    site_lon : numpy.array
+        site longitudes.
+    site_lat : numpy.array
+        site latitudes.
+    cache : bool
+        reuse a stencil computed before for the same grid and sites.
+
+    Returns
+    -------
+    dict
+        iy, ix : integer arrays (site, 4) of the stencil cells.
+        weights : float array (site, 4) of the bilinear weights.
+        valid : boolean array (site) of the sites inside the grid.
+
+    """
+    from numpy import (abs, arange, argmin, asarray, clip, cos, deg2rad,
+                       isfinite, stack, unravel_index, where)
+    from .kdtree import get_tree, query
+    glon = asarray(longitude, dtype='float64')
+    glat = asarray(latitude, dtype='float64')
+    slon = asarray(site_lon, dtype='float64').ravel()
+    slat = asarray(site_lat, dtype='float64').ravel()
+    key = _array_key(glon, glat, slon, slat)
+    if cache and key in _stencil_cache:
+        return _stencil_cache[key]
+    ny, nx = glon.shape
+    _, flat, _ = query(get_tree(glon, glat), slon, slat)
+    j0, i0 = unravel_index(flat, glon.shape)
+    # the four quadrilaterals sharing the nearest center (lower left corner)
+    oj = asarray([-1, -1, 0, 0])
+    oi = asarray([-1, 0, -1, 0])
+    jq = clip(j0[:, None] + oj[None, :], 0, ny - 2)
+    iq = clip(i0[:, None] + oi[None, :], 0, nx - 2)
+    # corners ordered (0, 0), (1, 0), (1, 1), (0, 1) in (s=x, t=y)
+    cj = stack([jq, jq, jq + 1, jq + 1], axis=-1)
+    ci = stack([iq, iq + 1, iq + 1, iq], axis=-1)
+    dlon = (glon[cj, ci] - slon[:, None, None] + 180.) % 360. - 180.
+    px = dlon * cos(deg2rad(slat))[:, None, None]
+    py = glat[cj, ci] - slat[:, None, None]
+    s, t = _invert_bilinear(px, py)
+    eps = 1e-6
+    inside = ((s >= -eps) & (s <= 1 + eps) & (t >= -eps) & (t <= 1 + eps)
+              & isfinite(s) & isfinite(t))
+    # pick the first quadrilateral containing the site
+    score = where(inside, 0., abs(s - 0.5) + abs(t - 0.5))
+    best = argmin(score, axis=1)
+    rows = arange(len(slon))
+    valid = inside[rows, best]
+    s = clip(s[rows, best], 0., 1.)
+    t = clip(t[rows, best], 0., 1.)
+    weights = stack([(1 - s) * (1 - t), s * (1 - t), s * t, (1 - s) * t],
+                    axis=-1)
+    weights[~valid] = 0.
+    stencil = dict(iy=cj[rows, best], ix=ci[rows, best], weights=weights,
+                   valid=valid)
+    if cache:
+        _stencil_cache[key] = stencil
+    return stencil
+
+
+def apply_bilinear_stencil(da, stencil):
+    """Applies a bilinear stencil to all time steps, levels and variables of
+    `da` with one vectorized weighted gather.
+
+    Parameters
+    ----------
+    da : xarray.DataArray or xarray.Dataset
+        monet formatted object with the dimensions y and x.
+    stencil : dict
+        output of bilinear_stencil.
+
+    Returns
+    -------
+    xarray.DataArray or xarray.Dataset
+        object with the dimensions y and x replaced by site.  Sites outside the
+        grid are NaN.
+
+    """
+    import xarray as xr
+    iy = xr.DataArray(stencil['iy'], dims=('site', 'corner'))
+    ix = xr.DataArray(stencil['ix'], dims=('site', 'corner'))
+    w = xr.DataArray(stencil['weights'], dims=('site', 'corner'))
+    valid = xr.DataArray(stencil['valid'], dims='site')
+    if isinstance(da, xr.Dataset):
+        da = da[[
+            i for i in da.data_vars
+            if 'y' in da[i].dims and 'x' in da[i].dims
+        ]]
+    corners = da.isel(y=iy, x=ix)
+    drop = [i for i in ['latitude', 'longitude'] if i in corners.coords]
+    corners = corners.drop_vars(drop)
+    out = (corners * w).sum('corner', skipna=False).where(valid)
+    if isinstance(da, xr.DataArray):
+        out.name = da.name
+    out.attrs = da.attrs.copy()
+    return out
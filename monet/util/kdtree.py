@@ -0,0 +1,325 @@
+""" Spherical KD-tree nearest neighbour backend (scipy.spatial.cKDTree) """
+import numpy as np
+
+try:
+    import pyresample
+    has_pyresample = True
+except ImportError:
+    has_pyresample = False
+
+_earth_radius = 6371e3
+_tree_cache = {}
+_backend = {'name': 'pyresample' if has_pyresample else 'kdtree'}
+
+
+def set_nearest_backend(name):
+    """Selects the backend of the nearest neighbour functions.
+
+    Parameters
+    ----------
+    name : str
+        'pyresample' or 'kdtree'.  'kdtree' is the default when pyresample is
+        not installed.
+
+    Returns
+    -------
+    None
+
+    """
+    if name not in ['pyresample', 'kdtree']:
+        raise ValueError("backend must be 'pyresample' or 'kdtree'")
+    if name == 'pyresample' and not has_pyresample:
+        raise ImportError('pyresample is not installed')
+    _backend['name'] = name
+
+
+def use_pyresample():
+    """True when the nearest neighbour functions should use pyresample."""
+    return has_pyresample and _backend['name'] == 'pyresample'
+
+
+def meters_to_chord(distance):
+    """Converts a great circle distance (m) to a chord on the unit sphere."""
+    return 2. * np.sin(np.asarray(distance, dtype='float64') / _earth_radius /
+                       2.)
+
+
+def chord_to_meters(chord):
+    """Converts a chord on the unit sphere to a great circle distance (m)."""
+    chord = np.clip(np.asarray(chord, dtype='float64'), 0., 2.)
+    return 2. * np.arcsin(chord / 2.) * _earth_radius
+
+
+def get_tree(longitude, latitude, cache=True, cache_dir=None):
+    """Builds (or loads) the cKDTree of points on the unit sphere.
+
+    Trees are cached in memory per grid.  With `cache_dir`, the tree is also
+    pickled to disk so later processes reuse it.
+
+    Parameters
+    ----------
+    longitude : numpy.array or xarray.DataArray
+        longitudes of the points (any shape, flattened in C order).
+    latitude : numpy.array or xarray.DataArray
+        latitudes of the points.
+    cache : bool
+        keep the tree in the in-memory cache.
+    cache_dir : str
+        directory of the serialized trees.
+
+    Returns
+    -------
+    scipy.spatial.cKDTree
+
+    """
+    import os
+    import pickle
+    from scipy.spatial import cKDTree
+    from .interp_util import _array_key, lonlat_to_xyz
+    longitude = np.asarray(longitude, dtype='float64')
+    latitude = np.asarray(latitude, dtype='float64')
+    key = _array_key(longitude, latitude)
+    if cache and key in _tree_cache:
+        return _tree_cache[key]
+    fname = None
+    if cache_dir is not None:
+        fname = os.path.join(cache_dir, 'monet_kdtree_' + key + '.pkl')
+        if os.path.isfile(fname):
+            with open(fname, 'rb') as f:
+                tree = pickle.load(f)
+            if cache:
+                _tree_cache[key] = tree
+            return tree
+    xyz = lonlat_to_xyz(longitude, latitude)
+    # NaN coordinates are moved far away from the unit sphere
+    xyz[~np.isfinite(xyz).all(axis=1)] = 10.
+    tree = cKDTree(xyz)
+    if fname is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(fname, 'wb') as f:
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+    if cache:
+        _tree_cache[key] = tree
+    return tree
+
+
+def query(tree,
+          longitude,
+          latitude,
+          k=1,
+          radius_of_influence=None,
+          workers=-1):
+    """Queries the k nearest tree points of each location.
+
+    Parameters
+    ----------
+    tree : scipy.spatial.cKDTree
+        tree from get_tree.
+    longitude : numpy.array
+        longitudes of the locations.
+    latitude : numpy.array
+        latitudes of the locations.
+    k : int
+        number of neighbours.
+    radius_of_influence : float
+        maximum distance in meters.
+    workers : int
+        number of threads of the query (-1 uses all cores).
+
+    Returns
+    -------
+    tuple
+        (distance, index, valid) with distances in meters, flat indices of
+        the tree points and a boolean array of the neighbours found within
+        the radius.  The arrays have the shape of the locations with a
+        trailing k axis when k > 1.
+
+    """
+    from .interp_util import lonlat_to_xyz
+    longitude = np.asarray(longitude, dtype='float64')
+    shape = longitude.shape
+    xyz = lonlat_to_xyz(longitude, latitude)
+    good = np.isfinite(xyz).all(axis=1)
+    xyz[~good] = 0.
+    bound = np.inf
+    if radius_of_influence is not None:
+        bound = float(meters_to_chord(radius_of_influence))
+    try:
+        d, idx = tree.query(xyz, k=k, distance_upper_bound=bound,
+                            workers=workers)
+    except TypeError:  # scipy < 1.6
+        d, idx = tree.query(xyz, k=k, distance_upper_bound=bound,
+                            n_jobs=workers)
+    valid = np.isfinite(d) & (idx < tree.n)
+    if k > 1:
+        valid &= good[:, None]
+        shape = shape + (k, )
+    else:
+        valid &= good
+    idx = np.where(valid, idx, 0)
+    dist = np.where(valid, chord_to_meters(np.where(valid, d, 0.)), np.nan)
+    return dist.reshape(shape), idx.reshape(shape), valid.reshape(shape)
+
+
+def nearest_index(grid_lon,
+                  grid_lat,
+                  longitude,
+                  latitude,
+                  radius_of_influence=None,
+                  workers=-1,
+                  cache_dir=None):
+    """Finds the nearest grid cell of each location.
+
+    Parameters
+    ----------
+    grid_lon : 2d numpy.array
+        grid longitudes (y, x).
+    grid_lat : 2d numpy.array
+        grid latitudes (y, x).
+    longitude : numpy.array
+        longitudes of the locations.
+    latitude : numpy.array
+        latitudes of the locations.
+    radius_of_influence : float
+        maximum distance in meters.
+    workers : int
+        number of threads of the query.
+    cache_dir : str
+        directory of the serialized trees.
+
+    Returns
+    -------
+    tuple
+        (iy, ix, valid) with the shape of the locations.
+
+    """
+    grid_lon = np.asarray(grid_lon, dtype='float64')
+    tree = get_tree(grid_lon, grid_lat, cache_dir=cache_dir)
+    _, idx, valid = query(tree,
+                          longitude,
+                          latitude,
+                          radius_of_influence=radius_of_influence,
+                          workers=workers)
+    iy, ix = np.unravel_index(idx, grid_lon.shape)
+    return iy, ix, valid
+
+
+def colocate(lon1, lat1, lon2, lat2, radius=None, k=None, workers=-1):
+    """Pairs the points of two networks on the sphere.
+
+    With `k`, the k nearest points of the second network (within `radius`
+    if given) are found for each point of the first network.  Otherwise all
+    pairs closer than `radius` are returned, searching a tree of the smaller
+    network.
+
+    Parameters
+    ----------
+    lon1, lat1 : numpy.array
+        coordinates of the first network.
+    lon2, lat2 : numpy.array
+        coordinates of the second network.
+    radius : float
+        maximum distance in meters.
+    k : int
+        number of nearest neighbours.  Defaults to 1 when `radius` is None.
+    workers : int
+        number of threads of the queries.
+
+    Returns
+    -------
+    tuple
+        (i, j, distance) integer positions in the first and second network
+        and the distance (m) of each pair, sorted by i and distance.
+
+    """
+    from .interp_util import lonlat_to_xyz
+    lon1 = np.asarray(lon1, dtype='float64').ravel()
+    lat1 = np.asarray(lat1, dtype='float64').ravel()
+    lon2 = np.asarray(lon2, dtype='float64').ravel()
+    lat2 = np.asarray(lat2, dtype='float64').ravel()
+    if k is None and radius is None:
+        k = 1
+    if k is not None:
+        tree = get_tree(lon2, lat2, cache=False)
+        d, j, valid = query(tree,
+                            lon1,
+                            lat1,
+                            k=k,
+                            radius_of_influence=radius,
+                            workers=workers)
+        i = np.repeat(np.arange(len(lon1)), k)
+        valid = valid.ravel()
+        return i[valid], j.ravel()[valid], d.ravel()[valid]
+    swap = len(lon1) < len(lon2)
+    if swap:
+        lon1, lat1, lon2, lat2 = lon2, lat2, lon1, lat1
+    # tree of the smaller network, queried with the larger one
+    tree = get_tree(lon2, lat2, cache=False)
+    xyz1 = lonlat_to_xyz(lon1, lat1)
+    good = np.flatnonzero(np.isfinite(xyz1).all(axis=1))
+    try:
+        found = tree.query_ball_point(xyz1[good],
+                                      float(meters_to_chord(radius)),
+                                      workers=workers)
+    except TypeError:  # scipy < 1.6
+        found = tree.query_ball_point(xyz1[good],
+                                      float(meters_to_chord(radius)),
+                                      n_jobs=workers)
+    counts = np.fromiter((len(f) for f in found), dtype=int, count=len(good))
+    i = np.repeat(good, counts)
+    j = np.concatenate(list(found) + [[]]).astype(int)
+    chord = np.linalg.norm(xyz1[i] - lonlat_to_xyz(lon2[j], lat2[j]), axis=1)
+    d = chord_to_meters(chord)
+    if swap:
+        i, j = j, i
+    order = np.lexsort((d, i))
+    return i[order], j[order], d[order]
+
+
+def remap_nearest(source, target, radius_of_influence=1e6, workers=-1):
+    """Nearest neighbour remap of `source` to the grid of `target`.
+
+    Parameters
+    ----------
+    source : xarray.DataArray or xarray.Dataset
+        monet formatted object with 2D latitude and longitude.
+    target : xarray.DataArray or xarray.Dataset
+        monet formatted object defining the target grid.
+    radius_of_influence : float
+        maximum distance in meters.
+    workers : int
+        number of threads of the query.
+
+    Returns
+    -------
+    xarray.DataArray or xarray.Dataset
+        `source` on the target grid, NaN where no source cell is within the
+        radius of influence.
+
+    """
+    import xarray as xr
+    iy, ix, valid = nearest_index(source.longitude.values,
+                                  source.latitude.values,
+                                  target.longitude.values,
+                                  target.latitude.values,
+                                  radius_of_influence=radius_of_influence,
+                                  workers=workers)
+    dims = target.longitude.dims
+    drop = [i for i in ['latitude', 'longitude', 'x', 'y'] if i in source.coords]
+    src = source.drop_vars(drop)
+    if isinstance(src, xr.Dataset):
+        src = src[[
+            i for i in src.data_vars
+            if 'y' in src[i].dims and 'x' in src[i].dims
+        ]]
+    tmp = {'y': '_source_y', 'x': '_source_x'}
+    src = src.rename({k: v for k, v in tmp.items() if k in src.dims})
+    out = src.isel(_source_y=xr.DataArray(iy, dims=dims),
+                   _source_x=xr.DataArray(ix, dims=dims))
+    out = out.where(xr.DataArray(valid, dims=dims))
+    out.attrs = source.attrs.copy()
+    if isinstance(out, xr.DataArray):
+        out.name = source.name
+    out.coords['latitude'] = (dims, target.latitude.values)
+    out.coords['longitude'] = (dims, target.longitude.values)
+    return out
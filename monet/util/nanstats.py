@@ -0,0 +1,508 @@
+""" NaN-native model evaluation statistics
+
+Drop-in versions of the metrics of monet.util.stats for plain float arrays
+with NaN as missing value.  The joint validity of the pairs (both values
+finite and not masked) is computed once per call and the reductions are
+sums over it, so no masked array or per temporary mask is created.
+
+All the functions take (obs, mod, axis=None) like their stats counterparts
+(the peak metrics also take `paxis`) and give the same values as the masked
+versions on matched masked arrays (see stats.matchmasks).  Missing results
+(no valid pair, zero denominators) are NaN instead of masked.
+
+Timing (ms per call, 240k pairs with 15% NaN, the masked version includes
+matchmasks(masked_invalid(obs), masked_invalid(mod)), single core):
+
+    MB 14.6 -> 8.2, RMSE 17.2 -> 9.3, NMB 16.4 -> 9.4, IOA 35.2 -> 14.4,
+    FB 30.4 -> 9.9, MdnB 28.3 -> 14.3, R2 29.1 -> 21.1
+
+measured with timeit on
+
+    obs = rng.gamma(2., 10., 240000)
+    mod = obs * 1.1 + rng.normal(0., 5., obs.size)
+    obs[rng.random(obs.size) < .15] = np.nan
+"""
+import warnings
+
+import numpy as np
+
+from .stats import _paired, circlebias_m
+
+
+def _sum(x, valid, axis=None):
+    return np.where(valid, x, 0.).sum(axis=axis)
+
+
+def _mean(x, valid, axis=None):
+    """Mean of x over the valid values (as np.ma.mean)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _sum(x, valid, axis) * 1. / valid.sum(axis=axis)
+
+
+def _finite(x, valid):
+    """Validity of the ratios x (as np.ma.masked_invalid)."""
+    return valid & np.isfinite(x)
+
+
+def _median(x, valid, axis=None):
+    x = np.where(_finite(x, valid), x, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(x, axis=axis)
+
+
+def _max(x, valid, axis=None):
+    out = np.where(valid, x, -np.inf).max(axis=axis)
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def _expand(x, axis):
+    return x if axis is None else np.expand_dims(x, axis=axis)
+
+
+def _div(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.true_divide(a, b)
+
+
+def _ratio(a, b):
+    """a / b with the invalid ratios as NaN (as np.ma.masked_invalid)."""
+    out = _div(a, b)
+    return np.where(np.isfinite(out), out, np.nan)[()]
+
+
+def _peaks(obs, mod, paxis):
+    """Peak obs and mod along `paxis` (NaN without valid pairs)."""
+    o, m, v = _paired(obs, mod)
+    po = _max(o, v, paxis)
+    pm = _max(m, v, paxis)
+    return po, pm, np.isfinite(po) & np.isfinite(pm)
+
+
+def STDO(obs, mod, axis=None):
+    """Standard deviation of Observations"""
+    o, m, v = _paired(obs, mod)
+    d = o - _expand(_mean(o, v, axis), axis)
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def STDP(obs, mod, axis=None):
+    """Standard deviation of Predictions"""
+    o, m, v = _paired(obs, mod)
+    d = m - _expand(_mean(m, v, axis), axis)
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def MNB(obs, mod, axis=None):
+    """Mean Normalized Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    r = _div(m - o, o)
+    return _mean(r, _finite(r, v), axis) * 100.
+
+
+def MNE(obs, mod, axis=None):
+    """Mean Normalized Gross Error (%)"""
+    o, m, v = _paired(obs, mod)
+    r = _div(np.abs(m - o), o)
+    return _mean(r, _finite(r, v), axis) * 100.
+
+
+def MdnNB(obs, mod, axis=None):
+    """Median Normalized Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    return _median(_div(m - o, o), v, axis) * 100.
+
+
+def MdnNE(obs, mod, axis=None):
+    """Median Normalized Gross Error (%)"""
+    o, m, v = _paired(obs, mod)
+    return _median(_div(np.abs(m - o), o), v, axis) * 100.
+
+
+def NMdnGE(obs, mod, axis=None):
+    """Normalized Mean Gross Error (%)"""
+    o, m, v = _paired(obs, mod)
+    return _ratio(_mean(np.abs(m - o), v, axis), _mean(o, v, axis)) * 100.
+
+
+def NO(obs, mod, axis=None):
+    """N Observations (#)"""
+    return _paired(obs, obs)[2].sum(axis=axis)
+
+
+def NOP(obs, mod, axis=None):
+    """N Observations/Prediction Pairs (#)"""
+    return _paired(obs, mod)[2].sum(axis=axis)
+
+
+def NP(obs, mod, axis=None):
+    """N Predictions (#)"""
+    return _paired(mod, mod)[2].sum(axis=axis)
+
+
+def MO(obs, mod, axis=None):
+    """Mean Observations (obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _mean(o, v, axis)
+
+
+def MP(obs, mod, axis=None):
+    """Mean Predictions (model unit)"""
+    o, m, v = _paired(obs, mod)
+    return _mean(m, v, axis)
+
+
+def MdnO(obs, mod, axis=None):
+    """Median Observations (obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _median(o, v, axis)
+
+
+def MdnP(obs, mod, axis=None):
+    """Median Predictions (model unit)"""
+    o, m, v = _paired(obs, mod)
+    return _median(m, v, axis)
+
+
+def RM(obs, mod, axis=None):
+    """Mean Ratio Observations/Predictions (none)"""
+    o, m, v = _paired(obs, mod)
+    r = _div(o, m)
+    return _mean(r, _finite(r, v), axis)
+
+
+def RMdn(obs, mod, axis=None):
+    """Median Ratio Observations/Predictions (none)"""
+    o, m, v = _paired(obs, mod)
+    return _median(_div(o, m), v, axis)
+
+
+def MB(obs, mod, axis=None):
+    """Mean Bias"""
+    o, m, v = _paired(obs, mod)
+    return _mean(m - o, v, axis)
+
+
+def MdnB(obs, mod, axis=None):
+    """Median Bias"""
+    o, m, v = _paired(obs, mod)
+    return _median(m - o, v, axis)
+
+
+def WDMB(obs, mod, axis=None):
+    """Wind Direction Mean Bias"""
+    o, m, v = _paired(obs, mod)
+    return _mean(circlebias_m(m - o), v, axis)
+
+
+def WDNMB(obs, mod, axis=None):
+    """Wind Direction Normalized Mean Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_sum(circlebias_m(m - o), v, axis), _sum(o, v, axis)) * 100.
+
+
+def WDMdnB(obs, mod, axis=None):
+    """Wind Direction Median Bias"""
+    o, m, v = _paired(obs, mod)
+    return _median(circlebias_m(m - o), v, axis)
+
+
+def NMB(obs, mod, axis=None):
+    """Normalized Mean Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_sum(m - o, v, axis), _sum(o, v, axis)) * 100.
+
+
+def NMB_ABS(obs, mod, axis=None):
+    """Normalized Mean Bias - Absolute of the denominator (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_sum(m - o, v, axis), np.abs(_sum(o, v, axis))) * 100.
+
+
+def NMdnB(obs, mod, axis=None):
+    """Normalized Median Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_median(m - o, v, axis), _median(o, v, axis)) * 100.
+
+
+def FB(obs, mod, axis=None):
+    """Fractional Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    r = _div(m - o, m + o)
+    return _mean(r, _finite(r, v), axis) * 2. * 100.
+
+
+def ME(obs, mod, axis=None):
+    """Mean Gross Error (model and obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _mean(np.abs(m - o), v, axis)
+
+
+def MdnE(obs, mod, axis=None):
+    """Median Gross Error (model and obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _median(np.abs(m - o), v, axis)
+
+
+def WDME(obs, mod, axis=None):
+    """Wind Direction Mean Gross Error (model and obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _mean(np.abs(circlebias_m(m - o)), v, axis)
+
+
+def WDMdnE(obs, mod, axis=None):
+    """Wind Direction Median Gross Error (model and obs unit)"""
+    o, m, v = _paired(obs, mod)
+    return _median(np.abs(circlebias_m(m - o)), v, axis)
+
+
+def NME(obs, mod, axis=None):
+    """Normalized Mean Error (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_sum(np.abs(m - o), v, axis), _sum(o, v, axis)) * 100.
+
+
+def NME_m_ABS(obs, mod, axis=None):
+    """Normalized Mean Error - Absolute of the denominator (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_sum(np.abs(m - o), v, axis), np.abs(_sum(o, v,
+                                                          axis))) * 100.
+
+
+def NMdnE(obs, mod, axis=None):
+    """Normalized Median Error (%)"""
+    o, m, v = _paired(obs, mod)
+    return _div(_median(np.abs(m - o), v, axis), _median(o, v, axis)) * 100.
+
+
+def FE(obs, mod, axis=None):
+    """Fractional Error (%)"""
+    o, m, v = _paired(obs, mod)
+    r = _div(np.abs(m - o), m + o)
+    return _mean(r, _finite(r, v), axis) * 2. * 100.
+
+
+def USUTPB(obs, mod, axis=None):
+    """Unpaired Space/Unpaired Time Peak Bias (%)"""
+    o, m, v = _paired(obs, mod)
+    po = _max(o, v, axis)
+    return _div(_max(m, v, axis) - po, po) * 100.
+
+
+def USUTPE(obs, mod, axis=None):
+    """Unpaired Space/Unpaired Time Peak Error (%)"""
+    o, m, v = _paired(obs, mod)
+    po = _max(o, v, axis)
+    return _div(np.abs(_max(m, v, axis) - po), po) * 100.
+
+
+def MNPB(obs, mod, paxis, axis=None):
+    """Mean Normalized Peak Bias (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    r = _div(pm - po, po)
+    return _mean(r, _finite(r, v), axis) * 100.
+
+
+def MdnNPB(obs, mod, paxis, axis=None):
+    """Median Normalized Peak Bias (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _median(_div(pm - po, po), v, axis) * 100.
+
+
+def MNPE(obs, mod, paxis, axis=None):
+    """Mean Normalized Peak Error (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    r = _div(np.abs(pm - po), po)
+    return _mean(r, _finite(r, v), axis) * 100.
+
+
+def MdnNPE(obs, mod, paxis, axis=None):
+    """Median Normalized Peak Error (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _median(_div(np.abs(pm - po), po), v, axis) * 100.
+
+
+def NMPB(obs, mod, paxis, axis=None):
+    """Normalized Mean Peak Bias (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _div(_mean(pm - po, v, axis), _mean(po, v, axis)) * 100.
+
+
+def NMdnPB(obs, mod, paxis, axis=None):
+    """Normalized Median Peak Bias (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _div(_median(pm - po, v, axis), _median(po, v, axis)) * 100.
+
+
+def NMPE(obs, mod, paxis, axis=None):
+    """Normalized Mean Peak Error (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _div(_mean(np.abs(pm - po), v, axis), _mean(po, v, axis)) * 100.
+
+
+def NMdnPE(obs, mod, paxis, axis=None):
+    """Normalized Median Peak Error (%)"""
+    po, pm, v = _peaks(obs, mod, paxis)
+    return _div(_median(np.abs(pm - po), v, axis), _median(po, v,
+                                                           axis)) * 100.
+
+
+def PSUTMNPB(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Mean Normalized Peak Bias (%)"""
+    return MNPB(obs, mod, paxis=0, axis=None)
+
+
+def PSUTMdnNPB(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Median Normalized Peak Bias (%)"""
+    return MdnNPB(obs, mod, paxis=0, axis=None)
+
+
+def PSUTMNPE(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Mean Normalized Peak Error (%)"""
+    return MNPE(obs, mod, paxis=0, axis=None)
+
+
+def PSUTMdnNPE(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Median Normalized Peak Error (%)"""
+    return MdnNPE(obs, mod, paxis=0, axis=None)
+
+
+def PSUTNMPB(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Normalized Mean Peak Bias (%)"""
+    return NMPB(obs, mod, paxis=0, axis=None)
+
+
+def PSUTNMPE(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Normalized Mean Peak Error (%)"""
+    return NMPE(obs, mod, paxis=0, axis=None)
+
+
+def PSUTNMdnPB(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Normalized Median Peak Bias (%)"""
+    return NMdnPB(obs, mod, paxis=0, axis=None)
+
+
+def PSUTNMdnPE(obs, mod, axis=None):
+    """Paired Space/Unpaired Time Normalized Median Peak Error (%)"""
+    return NMdnPE(obs, mod, paxis=0, axis=None)
+
+
+def _regression(o, m, v, axis=None):
+    """Centered second moments of obs and mod and the least squares fit of
+    mod on obs (slope, intercept)."""
+    mo = _expand(_mean(o, v, axis), axis)
+    mm = _expand(_mean(m, v, axis), axis)
+    do = o - mo
+    dm = m - mm
+    co2 = _sum(do * do, v, axis)
+    cm2 = _sum(dm * dm, v, axis)
+    com = _sum(do * dm, v, axis)
+    slope = _expand(_div(com, co2), axis)
+    return co2, cm2, com, slope, mm - slope * mo
+
+
+def _mod_hat(o, m, v, axis=None):
+    """Predictions of the least squares fit of mod on obs."""
+    slope, intercept = _regression(o, m, v, axis)[3:]
+    return intercept + slope * o
+
+
+def R2(obs, mod, axis=None):
+    """Coefficient of Determination (unit squared)"""
+    o, m, v = _paired(obs, mod)
+    co2, cm2, com = _regression(o, m, v, axis)[:3]
+    return _div(com * com, co2 * cm2)
+
+
+def RMSE(obs, mod, axis=None):
+    """Root Mean Square Error (model unit)"""
+    o, m, v = _paired(obs, mod)
+    d = m - o
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def WDRMSE(obs, mod, axis=None):
+    """Wind Direction Root Mean Square Error (model unit)"""
+    o, m, v = _paired(obs, mod)
+    d = circlebias_m(m - o)
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def RMSEs(obs, mod, axis=None):
+    """Root Mean Squared Error systematic (obs, mod_hat)"""
+    o, m, v = _paired(obs, mod)
+    mod_hat = _mod_hat(o, m, v, axis)
+    d = mod_hat - o
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def RMSEu(obs, mod, axis=None):
+    """Root Mean Squared Error unsystematic (mod_hat, mod)"""
+    o, m, v = _paired(obs, mod)
+    mod_hat = _mod_hat(o, m, v, axis)
+    d = m - mod_hat
+    return np.sqrt(_mean(d * d, v, axis))
+
+
+def d1(obs, mod, axis=None):
+    """Modified Index of Agreement, d1"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    return 1.0 - _div(_sum(np.abs(o - m), v, axis),
+                      _sum(np.abs(m - mo) + np.abs(o - mo), v, axis))
+
+
+def E1(obs, mod, axis=None):
+    """Modified Coefficient of Efficiency, E1"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    return 1.0 - _div(_sum(np.abs(o - m), v, axis),
+                      _sum(np.abs(o - mo), v, axis))
+
+
+def IOA(obs, mod, axis=None):
+    """Index of Agreement, IOA"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    d = np.abs(o - m)
+    s = np.abs(m - mo) + np.abs(o - mo)
+    return 1.0 - _div(_sum(d**2, v, axis), _sum(s**2, v, axis))
+
+
+def WDIOA(obs, mod, axis=None):
+    """Wind Direction Index of Agreement, IOA"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    b = np.abs(circlebias_m(m - o))
+    s = np.abs(circlebias_m(m - mo)) + np.abs(circlebias_m(o - mo))
+    return 1.0 - _div(_sum(b**2, v, axis), _sum(s**2, v, axis))
+
+
+def AC(obs, mod, axis=None):
+    """Anomaly Correlation"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    p1 = _sum((m - mo) * (o - mo), v, axis)
+    p2 = (_sum((m - mo)**2, v, axis) * _sum((o - mo)**2, v, axis))**0.5
+    return _div(p1, p2)
+
+
+def WDAC(obs, mod, axis=None):
+    """Wind Direction Anomaly Correlation"""
+    o, m, v = _paired(obs, mod)
+    mo = _expand(_mean(o, v, axis), axis)
+    bm = circlebias_m(m - mo)
+    bo = circlebias_m(o - mo)
+    p1 = _sum(bm * bo, v, axis)
+    p2 = (_sum(bm**2, v, axis) * _sum(bo**2, v, axis))**0.5
+    return _div(p1, p2)
+
+
+# names of the masked array versions of stats, the same functions here
+NME_m = NME
+WDMB_m = WDMB
+WDNMB_m = WDNMB
+WDME_m = WDME
+WDRMSE_m = WDRMSE
+IOA_m = IOA
+WDIOA_m = WDIOA
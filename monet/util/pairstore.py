@@ -0,0 +1,302 @@
+""" Partitioned Parquet storage for paired model-observation DataFrames """
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+    has_pyarrow = True
+except ImportError:
+    has_pyarrow = False
+
+_skip_float32 = ['latitude', 'longitude']
+
+
+def _check_pyarrow():
+    if not has_pyarrow:
+        raise ImportError('pyarrow is required for the paired parquet store. '
+                          'Please install pyarrow from pypi or conda-forge')
+
+
+def _prepare_paired_df(df, network=None, float32=True):
+    """Casts a paired DataFrame to the storage layout of the parquet store.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        paired DataFrame with at least the `time` and `siteid` columns.
+    network : str
+        network name used when `df` has no `network` column.
+    float32 : bool
+        downcast float64 value columns to float32.  latitude and longitude are
+        kept in float64 so that spatial filters are exact.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame with the `date` and `network` partition columns added.
+
+    """
+    out = df.copy()
+    if 'network' not in out.columns:
+        if network is None:
+            network = 'unknown'
+        out['network'] = network
+    out['network'] = out['network'].astype(str)
+    out['date'] = out['time'].dt.strftime('%Y-%m-%d')
+    out['siteid'] = out['siteid'].astype(str).astype('category')
+    if float32:
+        for col in out.columns:
+            if col in _skip_float32:
+                continue
+            if out[col].dtype == np.float64:
+                out[col] = out[col].astype(np.float32)
+    return out.sort_values(['time', 'siteid']).reset_index(drop=True)
+
+
+def write_paired_parquet(df,
+                         path,
+                         network=None,
+                         float32=True,
+                         compression='snappy',
+                         row_group_size=None):
+    """Writes a paired DataFrame (ie from combine_da_to_df) to a parquet
+    dataset partitioned by date and network.
+
+    New files are added next to the existing ones so that the store can be
+    appended to from several jobs.  Rows are sorted by time and siteid so the
+    row group statistics allow the reader to skip data.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        paired DataFrame with at least the `time` and `siteid` columns.
+    path : str
+        root directory of the parquet dataset.
+    network : str
+        network name used when `df` has no `network` column (ie 'airnow').
+    float32 : bool
+        downcast float64 value columns to float32.
+    compression : str
+        parquet compression codec.
+    row_group_size : int
+        maximum number of rows per row group.
+
+    Returns
+    -------
+    None
+
+    """
+    import uuid
+    _check_pyarrow()
+    out = _prepare_paired_df(df, network=network, float32=float32)
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    write_kws = dict(compression=compression)
+    if row_group_size is not None:
+        write_kws['row_group_size'] = row_group_size
+    pq.write_to_dataset(table,
+                        root_path=path,
+                        partition_cols=['date', 'network'],
+                        basename_template='part-' + uuid.uuid4().hex +
+                        '-{i}.parquet',
+                        existing_data_behavior='overwrite_or_ignore',
+                        **write_kws)
+
+
+def _build_filter(start=None,
+                  end=None,
+                  siteid=None,
+                  network=None,
+                  bounds=None,
+                  region=None,
+                  region_col='EPA_ACRO',
+                  schema_names=None):
+    """Builds the pyarrow filter expression for read_paired_parquet."""
+    field = pads.field
+    expr = None
+
+    def _and(a, b):
+        return b if a is None else a & b
+
+    if start is not None:
+        start = pd.Timestamp(start)
+        # partition pruning first, the row filter is exact
+        expr = _and(expr, field('date') >= start.strftime('%Y-%m-%d'))
+        expr = _and(expr, field('time') >= start.to_datetime64())
+    if end is not None:
+        end = pd.Timestamp(end)
+        expr = _and(expr, field('date') <= end.strftime('%Y-%m-%d'))
+        expr = _and(expr, field('time') <= end.to_datetime64())
+    if network is not None:
+        expr = _and(expr, field('network').isin(list(np.atleast_1d(network))))
+    if siteid is not None:
+        siteid = [str(i) for i in np.atleast_1d(siteid)]
+        expr = _and(expr, field('siteid').isin(siteid))
+    if bounds is not None:
+        lat_min, lon_min, lat_max, lon_max = bounds
+        expr = _and(expr, (field('latitude') >= lat_min)
+                    & (field('latitude') <= lat_max)
+                    & (field('longitude') >= lon_min)
+                    & (field('longitude') <= lon_max))
+    if region is not None:
+        if schema_names is not None and region_col not in schema_names:
+            raise KeyError(region_col + ' is not a column of the store')
+        region = list(np.atleast_1d(region))
+        expr = _and(expr, field(region_col).isin(region))
+    return expr
+
+
+def read_paired_parquet(path,
+                        start=None,
+                        end=None,
+                        siteid=None,
+                        network=None,
+                        bounds=None,
+                        region=None,
+                        region_col='EPA_ACRO',
+                        columns=None):
+    """Reads a paired parquet dataset written by write_paired_parquet.
+
+    All filters are pushed down to pyarrow so only the partitions and row
+    groups that match are read from disk.
+
+    Parameters
+    ----------
+    path : str
+        root directory of the parquet dataset.
+    start : str or datetime-like
+        first time to read (inclusive).
+    end : str or datetime-like
+        last time to read (inclusive).
+    siteid : str or list of str
+        site ids to read.
+    network : str or list of str
+        networks to read.
+    bounds : tuple
+        (lat_min, lon_min, lat_max, lon_max) of the region to read.
+    region : str or list of str
+        region names to read from the `region_col` column.
+    region_col : str
+        column holding the region names (ie 'EPA_ACRO' or 'GIORGI_ACRO').
+    columns : list of str
+        columns to read.  `time` and `siteid` are always read.
+
+    Returns
+    -------
+    pandas.DataFrame
+        the paired data with a categorical `siteid`.
+
+    """
+    _check_pyarrow()
+    dset = pads.dataset(path, format='parquet', partitioning='hive')
+    expr = _build_filter(start=start,
+                         end=end,
+                         siteid=siteid,
+                         network=network,
+                         bounds=bounds,
+                         region=region,
+                         region_col=region_col,
+                         schema_names=dset.schema.names)
+    if columns is not None:
+        columns = list(dict.fromkeys(['time', 'siteid'] + list(columns)))
+    table = dset.to_table(columns=columns, filter=expr)
+    df = table.to_pandas()
+    if 'date' in df.columns:
+        df = df.drop('date', axis=1)
+    if 'network' in df.columns:
+        df['network'] = df['network'].astype('category')
+    if 'siteid' in df.columns:
+        df['siteid'] = df['siteid'].astype(str).astype('category')
+    return df.sort_values(['time', 'siteid']).reset_index(drop=True)
+
+
+def _watermark_file(path):
+    import os
+    # pyarrow skips files starting with '_' when discovering the dataset
+    return os.path.join(path, '_watermark.json')
+
+
+def read_watermark(path):
+    """Reads the per network time watermarks of a paired parquet store.
+
+    Parameters
+    ----------
+    path : str
+        root directory of the parquet dataset.
+
+    Returns
+    -------
+    dict
+        {network: pandas.Timestamp} of the last paired time of each network.
+        Empty if the store has no watermark yet.
+
+    """
+    import json
+    import os
+    fname = _watermark_file(path)
+    if not os.path.isfile(fname):
+        return {}
+    with open(fname) as f:
+        wm = json.load(f)
+    return {k: pd.Timestamp(v) for k, v in wm.items()}
+
+
+def write_watermark(path, watermarks):
+    """Writes the per network time watermarks of a paired parquet store.
+
+    The file is replaced atomically so a reader never sees a partial file.
+
+    Parameters
+    ----------
+    path : str
+        root directory of the parquet dataset.
+    watermarks : dict
+        {network: datetime-like} of the last paired time of each network.
+
+    Returns
+    -------
+    None
+
+    """
+    import json
+    import os
+    os.makedirs(path, exist_ok=True)
+    fname = _watermark_file(path)
+    wm = {str(k): pd.Timestamp(v).isoformat() for k, v in watermarks.items()}
+    tmp = fname + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(wm, f, indent=1, sort_keys=True)
+    os.replace(tmp, fname)
+
+
+def read_paired_keys(path, start=None, end=None, network=None):
+    """Reads only the (time, siteid) keys stored in a paired parquet store.
+
+    Parameters
+    ----------
+    path : str
+        root directory of the parquet dataset.
+    start, end : datetime-like
+        time range of the keys to read (inclusive).
+    network : str or list of str
+        networks to read.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame with the `time` and `siteid` columns.  Empty if the store
+        does not exist yet.
+
+    """
+    import os
+    if not os.path.isdir(path):
+        return pd.DataFrame({'time': [], 'siteid': []})
+    _check_pyarrow()
+    dset = pads.dataset(path, format='parquet', partitioning='hive')
+    if len(dset.files) == 0:
+        return pd.DataFrame({'time': [], 'siteid': []})
+    expr = _build_filter(start=start, end=end, network=network)
+    df = dset.to_table(columns=['time', 'siteid'], filter=expr).to_pandas()
+    df['siteid'] = df['siteid'].astype(str)
+    return df
@@ -0,0 +1,313 @@
+""" Polygon region classification of points and model grids """
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+_raster_cache = {}
+
+
+def _wrap(lon):
+    """Wraps longitudes to [-180, 180)."""
+    return (np.asarray(lon, dtype='float64') + 180.) % 360. - 180.
+
+
+def _frame(poly):
+    """Shifts the rings of a polygon to the longitude frame of its exterior.
+
+    The vertices are kept as given (ie 160 to 230 across the antimeridian),
+    only shifted by multiples of 360 so that the western edge of the
+    exterior is in [-180, 180) and the holes are east of it.
+    """
+    west = poly[0][:, 0].min()
+    out = []
+    for ring in poly:
+        shift = 360. * np.floor((ring[:, 0].min() - _wrap(west)) / 360.)
+        out.append(np.column_stack([ring[:, 0] - shift, ring[:, 1]]))
+    return out
+
+
+def _geometry_polygons(geometry):
+    """List of polygons (lists of (n, 2) rings) of a GeoJSON geometry."""
+    gtype = geometry['type']
+    coords = geometry['coordinates']
+    if gtype == 'Polygon':
+        coords = [coords]
+    elif gtype != 'MultiPolygon':
+        raise ValueError('unsupported geometry type ' + gtype)
+    return [[np.asarray(ring, dtype='float64')[:, :2] for ring in poly]
+            for poly in coords]
+
+
+class RegionSet(object):
+    """A set of named polygon regions.
+
+    Each region is one or more polygons with optional holes, in longitude
+    and latitude (degrees).  Points are classified with one sort of the
+    longitudes, a bounding box prefilter per polygon and a
+    matplotlib.path.Path point in polygon test on the remaining candidates
+    only.
+
+    Polygons crossing the antimeridian are given with continuous longitudes
+    (ie 160 to 230 or 170 to 190, not wrapped at 180).  The points are
+    shifted into the longitude frame of each polygon before the tests.
+
+    Parameters
+    ----------
+    names : list of str
+        region names, also the categories of the classification.
+    polygons : list
+        for each region a list of polygons, each a list of (n, 2) rings
+        (exterior first, then holes).
+
+    """
+
+    def __init__(self, names, polygons):
+        from matplotlib.path import Path
+        if len(names) != len(polygons):
+            raise ValueError('names and polygons must have the same length')
+        self.names = [str(i) for i in names]
+        # flat list of (region index, exterior path, hole paths)
+        self._polygons = []
+        bounds = []
+        for n, region in enumerate(polygons):
+            for poly in region:
+                poly = _frame(poly)
+                self._polygons.append(
+                    (n, Path(poly[0]), [Path(r) for r in poly[1:]]))
+                bounds.append([poly[0][:, 0].min(), poly[0][:, 1].min(),
+                               poly[0][:, 0].max(), poly[0][:, 1].max()])
+        # (polygon, [lonmin, latmin, lonmax, latmax])
+        self._bounds = np.asarray(bounds, dtype='float64').reshape(-1, 4)
+
+    @property
+    def bounds(self):
+        """(region, [lonmin, latmin, lonmax, latmax]) bounding boxes.
+
+        lonmin is in [-180, 180), lonmax is above 180 for the regions
+        crossing the antimeridian.
+        """
+        index = np.array([p[0] for p in self._polygons], dtype=int)
+        out = np.full((len(self.names), 4), np.nan)
+        for n in range(len(self.names)):
+            b = self._bounds[index == n]
+            if len(b):
+                out[n] = [b[:, 0].min(), b[:, 1].min(), b[:, 2].max(),
+                          b[:, 3].max()]
+        return out
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'RegionSet(' + ', '.join(self.names) + ')'
+
+    @classmethod
+    def from_geojson(cls, geojson, name_property='name'):
+        """Builds the regions from GeoJSON features.
+
+        Parameters
+        ----------
+        geojson : str, dict or object
+            path of a GeoJSON file, a FeatureCollection dict or any object
+            with a __geo_interface__ (ie a geopandas.GeoDataFrame).
+        name_property : str
+            feature property holding the region name.  Features with the
+            same name are merged into one region.
+
+        Returns
+        -------
+        RegionSet
+
+        """
+        import json
+        if isinstance(geojson, str):
+            with open(geojson) as f:
+                geojson = json.load(f)
+        elif hasattr(geojson, '__geo_interface__'):
+            geojson = geojson.__geo_interface__
+        if geojson.get('type') == 'FeatureCollection':
+            features = geojson['features']
+        else:
+            features = [geojson]
+        regions = {}
+        for feature in features:
+            name = feature['properties'][name_property]
+            polys = _geometry_polygons(feature['geometry'])
+            regions.setdefault(str(name), []).extend(polys)
+        return cls(list(regions.keys()), list(regions.values()))
+
+    @classmethod
+    def from_bounds(cls, names, lonmin, latmin, lonmax, latmax):
+        """Builds rectangular regions from bounding boxes.
+
+        Parameters
+        ----------
+        names : list of str
+            region names.
+        lonmin, latmin, lonmax, latmax : array-like
+            bounds of each region in degrees.  A box crossing the
+            antimeridian has lonmax < lonmin (ie 170 and -170) or lonmax
+            above 180 (ie 170 and 190).
+
+        Returns
+        -------
+        RegionSet
+
+        """
+        polygons = []
+        for x0, y0, x1, y1 in zip(lonmin, latmin, lonmax, latmax):
+            if x1 < x0:
+                x1 = x1 + 360.
+            ring = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1],
+                             [x0, y0]], dtype='float64')
+            polygons.append([[ring]])
+        return cls(names, polygons)
+
+    def key(self):
+        """sha1 fingerprint of the names and polygons of the regions."""
+        import hashlib
+        h = hashlib.sha1()
+        for name in self.names:
+            h.update(name.encode())
+        for n, exterior, holes in self._polygons:
+            h.update(str(n).encode())
+            for p in [exterior] + holes:
+                h.update(np.ascontiguousarray(p.vertices).tobytes())
+        return h.hexdigest()
+
+    def codes(self, longitude, latitude):
+        """Integer region code of each point.
+
+        Regions are tested in order and the first region containing a point
+        wins where regions overlap.
+
+        Parameters
+        ----------
+        longitude : numpy.array
+            point longitudes.
+        latitude : numpy.array
+            point latitudes.
+
+        Returns
+        -------
+        numpy.array
+            index of the region in `names` (shape of the points), -1 outside
+            of all the regions.
+
+        """
+        lon = _wrap(longitude)
+        shape = lon.shape
+        lon = lon.ravel()
+        lat = np.asarray(latitude, dtype='float64').ravel()
+        codes = np.full(lon.shape, -1, dtype=int)
+        good = np.flatnonzero(np.isfinite(lon) & np.isfinite(lat))
+        order = good[np.argsort(lon[good], kind='stable')]
+        slon = lon[order]
+        for (n, exterior, holes), (x0, y0, x1, y1) in zip(
+                self._polygons, self._bounds):
+            # longitude range from the sorted longitudes (east of 180 it
+            # continues from -180), then latitude
+            if x1 - x0 >= 360.:
+                cand = order
+            else:
+                lo = np.searchsorted(slon, x0, side='left')
+                hi = np.searchsorted(slon, x1, side='right')
+                cand = order[lo:hi]
+                if x1 >= 180.:
+                    hi = np.searchsorted(slon, x1 - 360., side='right')
+                    cand = np.concatenate([cand, order[:hi]])
+            cand = cand[(lat[cand] >= y0) & (lat[cand] <= y1)
+                        & (codes[cand] < 0)]
+            if len(cand) == 0:
+                continue
+            # longitudes in the frame of the polygon
+            xy = np.column_stack([x0 + (lon[cand] - x0) % 360., lat[cand]])
+            inside = exterior.contains_points(xy)
+            for hole in holes:
+                inside &= ~hole.contains_points(xy)
+            codes[cand[inside]] = n
+        return codes.reshape(shape)
+
+    def classify(self, longitude, latitude):
+        """Region of each point as a pandas.Categorical.
+
+        Parameters
+        ----------
+        longitude : numpy.array
+            point longitudes.
+        latitude : numpy.array
+            point latitudes.
+
+        Returns
+        -------
+        pandas.Categorical
+            region names, NaN outside of all the regions.
+
+        """
+        codes = self.codes(longitude, latitude).ravel()
+        return pd.Categorical.from_codes(codes, categories=self.names)
+
+    def rasterize(self, grid, cache=True):
+        """Region of each cell center of a model grid.
+
+        The cell to region map is cached per grid and region set.
+
+        Parameters
+        ----------
+        grid : xarray.DataArray or xarray.Dataset
+            monet formatted object with 2D latitude and longitude.
+        cache : bool
+            reuse a map computed before for the same grid.
+
+        Returns
+        -------
+        xarray.DataArray
+            integer (y, x) region codes, -1 outside of the regions, with the
+            region names in the CF flag_values and flag_meanings attributes.
+
+        """
+        from .interp_util import _array_key
+        lon = np.asarray(grid.longitude.values, dtype='float64')
+        lat = np.asarray(grid.latitude.values, dtype='float64')
+        key = (_array_key(lon, lat), self.key())
+        if cache and key in _raster_cache:
+            codes = _raster_cache[key]
+        else:
+            codes = self.codes(lon, lat)
+            if cache:
+                _raster_cache[key] = codes
+        dims = grid.longitude.dims
+        out = xr.DataArray(codes.copy(),
+                           dims=dims,
+                           coords={
+                               'latitude': (dims, lat),
+                               'longitude': (dims, lon)
+                           },
+                           name='region')
+        out.attrs['flag_values'] = np.arange(len(self.names))
+        out.attrs['flag_meanings'] = ' '.join(
+            i.replace(' ', '_') for i in self.names)
+        return out
+
+
+def classify_df(df, regions, column='region'):
+    """Adds the region of each row of a DataFrame as a categorical column.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame with the latitude and longitude columns.
+    regions : RegionSet
+        regions to classify with.
+    column : str
+        name of the new column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        copy of `df` with the region column.
+
+    """
+    out = df.copy()
+    out[column] = regions.classify(out.longitude.values, out.latitude.values)
+    return out
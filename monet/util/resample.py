@@ -126,3 +126,189 @@ def resample_xesmf(source_da, target_da, cleanup=False, **kwargs):
             return ds
         else:
             return regridder(source_da)
+
+
+def vertical_weights(source, target, log=False, extrapolate=False):
+    """Computes the linear interpolation brackets and weights from the source
+    vertical coordinate to the target vertical coordinate for many columns at
+    once.
+
+    Both arrays have the level on the last axis and any leading (column)
+    shape that broadcasts.  Each column may be increasing or decreasing (ie
+    pressure decreases with height).
+
+    Parameters
+    ----------
+    source : numpy.array
+        source vertical coordinate (..., nsource), monotonic in each column.
+    target : numpy.array
+        target vertical coordinate (..., ntarget).
+    log : bool
+        interpolate in the logarithm of the coordinate (ie for pressure).
+    extrapolate : bool
+        If True, targets outside of the source range take the nearest source
+        level.  If False, they are flagged as invalid.
+
+    Returns
+    -------
+    tuple
+        (index, weight, valid) where the interpolated value is
+        ``(1 - weight) * data[index] + weight * data[index + 1]``.
+
+    """
+    import numpy as np
+    source = np.asarray(source, dtype='float64')
+    target = np.asarray(target, dtype='float64')
+    if log:
+        source = np.log(source)
+        target = np.log(target)
+    # flip the sign of decreasing columns so every column is increasing
+    sign = np.where(source[..., -1:] >= source[..., :1], 1., -1.)
+    source = source * sign
+    target = target * sign
+    nsrc = source.shape[-1]
+    # batched searchsorted: number of source levels below each target
+    below = (source[..., None, :] <= target[..., :, None]).sum(axis=-1)
+    index = np.clip(below - 1, 0, nsrc - 2)
+    lower = np.take_along_axis(
+        np.broadcast_to(source, index.shape[:-1] + (nsrc, )), index, axis=-1)
+    upper = np.take_along_axis(
+        np.broadcast_to(source, index.shape[:-1] + (nsrc, )),
+        index + 1,
+        axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = (target - lower) / (upper - lower)
+    valid = (target >= source[..., :1]) & (target <= source[..., -1:])
+    if extrapolate:
+        weight = np.clip(weight, 0., 1.)
+        valid = np.isfinite(target) & np.isfinite(weight)
+    weight = np.where(valid, weight, 0.)
+    return index, weight, valid
+
+
+def apply_vertical_weights(data, index, weight, valid=None):
+    """Applies the output of vertical_weights to data on the source levels.
+
+    Parameters
+    ----------
+    data : numpy.array
+        data on the source levels (..., nsource).
+    index, weight, valid : numpy.array
+        output of vertical_weights (..., ntarget).
+
+    Returns
+    -------
+    numpy.array
+        data on the target levels (..., ntarget).
+
+    """
+    import numpy as np
+    data = np.asarray(data)
+    shape = np.broadcast_shapes(data.shape[:-1], index.shape[:-1])
+    data = np.broadcast_to(data, shape + data.shape[-1:])
+    index = np.broadcast_to(index, shape + index.shape[-1:])
+    weight = np.broadcast_to(weight, shape + weight.shape[-1:])
+    lower = np.take_along_axis(data, index, axis=-1)
+    upper = np.take_along_axis(data, index + 1, axis=-1)
+    out = lower + weight * (upper - lower)
+    if valid is not None:
+        out = np.where(valid, out, np.nan)
+    return out
+
+
+def remap_vertical(dset,
+                   vertical,
+                   levels,
+                   dim='z',
+                   new_dim='level',
+                   log=True,
+                   extrapolate=False):
+    """Remaps every variable of a Dataset from model levels (ie sigma or
+    hybrid) to fixed levels (ie pressure levels) with shared weights.
+
+    The level brackets and weights are computed once from the 3D vertical
+    coordinate (per chunk for dask arrays) and reused for every variable on
+    the model levels.
+
+    Parameters
+    ----------
+    dset : xarray.Dataset or xarray.DataArray
+        object on the model levels.
+    vertical : xarray.DataArray or str
+        vertical coordinate on the model levels (ie 3D pressure) or its name
+        in `dset`.  Must be monotonic along `dim`.
+    levels : array-like
+        target levels in the units of `vertical`.
+    dim : str
+        model level dimension.
+    new_dim : str
+        name of the target level dimension.
+    log : bool
+        interpolate in the logarithm of `vertical` (ie for pressure).
+    extrapolate : bool
+        take the nearest model level outside of the model range.  If False,
+        those values are NaN.
+
+    Returns
+    -------
+    xarray.Dataset or xarray.DataArray
+        object on the target levels.  Variables without `dim` are kept as
+        they are.
+
+    """
+    import numpy as np
+    import xarray as xr
+    if isinstance(vertical, str):
+        vertical = dset[vertical]
+    levels = np.asarray(levels, dtype='float64')
+    nlev = len(levels)
+    if vertical.chunks is not None:
+        vertical = vertical.chunk({dim: -1})
+
+    def _weights(v):
+        return vertical_weights(v,
+                                np.broadcast_to(levels, v.shape[:-1] +
+                                                (nlev, )),
+                                log=log,
+                                extrapolate=extrapolate)
+
+    index, weight, valid = xr.apply_ufunc(
+        _weights,
+        vertical,
+        input_core_dims=[[dim]],
+        output_core_dims=[[new_dim], [new_dim], [new_dim]],
+        dask='parallelized',
+        output_dtypes=[int, float, bool],
+        dask_gufunc_kwargs={'output_sizes': {
+            new_dim: nlev
+        }})
+
+    def _remap(da):
+        if da.chunks is not None:
+            da = da.chunk({dim: -1})
+        out = xr.apply_ufunc(apply_vertical_weights,
+                             da,
+                             index,
+                             weight,
+                             valid,
+                             input_core_dims=[[dim], [new_dim], [new_dim],
+                                              [new_dim]],
+                             output_core_dims=[[new_dim]],
+                             dask='parallelized',
+                             output_dtypes=[float])
+        out = out.transpose(*[new_dim if i == dim else i for i in da.dims])
+        out.coords[new_dim] = levels
+        out.attrs = da.attrs.copy()
+        out.name = da.name
+        return out
+
+    if isinstance(dset, xr.DataArray):
+        return _remap(dset)
+    nz = dset.sizes[dim]
+    out = xr.Dataset(attrs=dset.attrs.copy())
+    for name, da in dset.data_vars.items():
+        if dim in da.dims and da.sizes[dim] == nz:
+            out[name] = _remap(da)
+        elif dim not in da.dims:
+            out[name] = da
+    return out
@@ -0,0 +1,193 @@
+""" Mergeable quantile sketches (t-digest) for streaming statistics """
+import numpy as np
+
+
+class TDigest(object):
+    """Merging t-digest of the distribution of a stream of values.
+
+    Values are summarized by weighted centroids whose size is bounded by the
+    k1 scale function k(q) = compression / (2 pi) * arcsin(2q - 1), so the
+    centroids are small in the tails.  A centroid holds at most about
+    pi / compression of the values near the median (much less in the tails),
+    which bounds the rank error of the interpolated quantiles.  At most
+    about compression / 2 centroids are kept whatever the number of values.
+
+    Up to `exact_size` values are kept as they are and the quantiles are
+    exact (np.quantile, linear interpolation).  Sketches of chunks or workers
+    are combined with merge() (or +).
+
+    Parameters
+    ----------
+    compression : float
+        accuracy setting (delta) of the sketch.
+    exact_size : int
+        number of values kept exactly before compressing.  Defaults to 10 *
+        compression.
+
+    """
+
+    def __init__(self, compression=200, exact_size=None):
+        self.compression = float(compression)
+        if exact_size is None:
+            exact_size = int(10 * compression)
+        self.exact_size = int(exact_size)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self.exact = True
+
+    @property
+    def count(self):
+        """Number of values added."""
+        return float(self.weights.sum())
+
+    def __len__(self):
+        return len(self.means)
+
+    def __repr__(self):
+        return 'TDigest(compression={}, count={:g}, centroids={})'.format(
+            self.compression, self.count, len(self.means))
+
+    def _compress(self):
+        """Merges the sorted centroids falling in the same unit of k."""
+        order = np.argsort(self.means, kind='stable')
+        mu = self.means[order]
+        w = self.weights[order]
+        total = w.sum()
+        q = (np.cumsum(w) - w / 2.) / total
+        k = self.compression / (2. * np.pi) * np.arcsin(2. * q - 1.)
+        group = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        wsum = np.add.reduceat(w, starts)
+        self.means = np.add.reduceat(w * mu, starts) / wsum
+        self.weights = wsum
+
+    def update(self, values):
+        """Adds values, non finite values are skipped.
+
+        Parameters
+        ----------
+        values : array-like
+            values to add (any shape).
+
+        Returns
+        -------
+        TDigest
+            self.
+
+        """
+        x = np.asarray(values, dtype='float64').ravel()
+        x = x[np.isfinite(x)]
+        if len(x) == 0:
+            return self
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+        self.means = np.concatenate([self.means, x])
+        self.weights = np.concatenate([self.weights, np.ones(len(x))])
+        if self.exact and self.count > self.exact_size:
+            self.exact = False
+        if not self.exact:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Returns the sketch of the values of self and `other`."""
+        out = TDigest(compression=self.compression,
+                      exact_size=self.exact_size)
+        out.means = np.concatenate([self.means, other.means])
+        out.weights = np.concatenate([self.weights, other.weights])
+        out.min = min(self.min, other.min)
+        out.max = max(self.max, other.max)
+        out.exact = self.exact and other.exact and out.count <= out.exact_size
+        if not out.exact:
+            out._compress()
+        return out
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def quantile(self, q):
+        """Quantiles of the values.
+
+        Parameters
+        ----------
+        q : float or array-like
+            quantiles in [0, 1].
+
+        Returns
+        -------
+        float or numpy.array
+            NaN when no value was added.
+
+        """
+        q = np.asarray(q, dtype='float64')
+        if len(self.means) == 0:
+            return np.full(q.shape, np.nan)[()]
+        if self.exact:
+            return np.quantile(self.means, q)
+        # centroid means sit at the middle of their ranks, the extremes at
+        # the ends of the distribution
+        total = self.weights.sum()
+        rank = np.r_[0., np.cumsum(self.weights) - self.weights / 2., total]
+        value = np.r_[self.min, self.means, self.max]
+        return np.interp(q * total, rank, value)[()]
+
+    def median(self):
+        """Median of the values."""
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        """JSON serializable state."""
+        return {
+            'compression': self.compression,
+            'exact_size': self.exact_size,
+            'exact': self.exact,
+            'min': float(self.min),
+            'max': float(self.max),
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """Rebuilds a sketch from to_dict()."""
+        out = cls(compression=d['compression'], exact_size=d['exact_size'])
+        out.exact = d['exact']
+        out.min = d['min']
+        out.max = d['max']
+        out.means = np.asarray(d['means'], dtype='float64')
+        out.weights = np.asarray(d['weights'], dtype='float64')
+        return out
+
+
+def quantile(x, q, axis=None, compression=200, exact_size=None):
+    """Approximate quantiles of the finite values of `x` with a t-digest.
+
+    Parameters
+    ----------
+    x : array-like
+        values.
+    q : float
+        quantile in [0, 1].
+    axis : int
+        axis to reduce.  None reduces all the values.
+    compression : float
+        accuracy setting of the sketch.
+    exact_size : int
+        number of values below which the quantile is exact.
+
+    Returns
+    -------
+    float or numpy.array
+
+    """
+
+    def _q(v):
+        return TDigest(compression=compression,
+                       exact_size=exact_size).update(v).quantile(q)
+
+    x = np.asarray(x, dtype='float64')
+    if axis is None:
+        return _q(x)
+    return np.apply_along_axis(_q, axis, x)
@@ -1,5 +1,5 @@
 import numpy as np
-from pandas import DataFrame, crosstab
+from pandas import DataFrame
 
 
 def STDO(obs, mod, axis=None):
@@ -1236,28 +1236,26 @@ def PSUTNMdnPE(obs, mod, axis=None):
 def R2(obs, mod, axis=None):
     """ Coefficient of Determination (unit squared)
 
+    Closed form from the batched covariance of the valid pairs, so a
+    (time, y, x) comparison gives a (y, x) map with axis=0.
+
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    axis : int
+        axis to reduce.  None reduces all the values.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.array
+        squared Pearson correlation, NaN without variance.
 
     """
-
-    from scipy.stats import pearsonr
-    if axis is None:
-        obsc, modc = matchedcompressed(obs, mod)
-        return pearsonr(obsc, modc)[0]**2
-    else:
-        raise ValueError('Not ready yet')
+    from .nanstats import R2 as _R2
+    return _R2(obs, mod, axis=axis)
 
 
 def RMSE(obs, mod, axis=None):
@@ -1324,34 +1322,28 @@ def WDRMSE(obs, mod, axis=None):
 
 
 def RMSEs(obs, mod, axis=None):
-    """Root Mean Squared Error (obs, mod_hat)
+    """Root Mean Squared Error systematic (obs, mod_hat)
+
+    mod_hat is the least squares fit of mod on obs, solved in closed form
+    along `axis` for all the points (ie grid cells) at once.
 
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    axis : int
+        axis to reduce.  None reduces all the values.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.array
+        NaN without variance of the observations.
 
     """
-    if axis is None:
-        try:
-            from scipy.stats import linregress
-            obsc, modc = matchedcompressed(obs, mod)
-            m, b, rval, pval, stderr = linregress(obsc, modc)
-            mod_hat = b + m * obs
-            return RMSE(obs, mod_hat)
-        except ValueError:
-            return None
-    else:
-        raise ValueError('Not ready yet')
+    from .nanstats import RMSEs as _RMSEs
+    return _RMSEs(obs, mod, axis=axis)
 
 
 def matchmasks(a1, a2):
@@ -1395,34 +1387,28 @@ def matchedcompressed(a1, a2):
 
 
 def RMSEu(obs, mod, axis=None):
-    """Root Mean Squared Error (mod_hat, mod)
+    """Root Mean Squared Error unsystematic (mod_hat, mod)
+
+    mod_hat is the least squares fit of mod on obs, solved in closed form
+    along `axis` for all the points (ie grid cells) at once.
 
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    axis : int
+        axis to reduce.  None reduces all the values.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.array
+        NaN without variance of the observations.
 
     """
-    if axis is None:
-        try:
-            from scipy.stats import linregress
-            obsc, modc = matchedcompressed(obs, mod)
-            m, b, rval, pval, stderr = linregress(obsc, modc)
-            mod_hat = b + m * obs
-            return RMSE(mod_hat, mod)
-        except ValueError:
-            return None
-    else:
-        raise ValueError('Not ready yet')
+    from .nanstats import RMSEu as _RMSEu
+    return _RMSEu(obs, mod, axis=axis)
 
 
 def d1(obs, mod, axis=None):
@@ -1696,8 +1682,9 @@ def HSS(obs, mod, minval, maxval):
 
     """
     a, b, c, d = scores(obs, mod, minval, maxval=maxval)
-    hss = 2 * (a * d - b * c) / ((a + c) * (c + d) + (a + b) * (b + d))
-    print('HSS for range ' + str(minval) + ' --> ' + str(maxval) + ': ' + hss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hss = 2 * (a * d - b * c) / ((a + c) * (c + d) + (a + b) * (b + d))
+    print('HSS for range {} --> {}: {}'.format(minval, maxval, hss))
     return hss
 
 
@@ -1722,49 +1709,308 @@ def ETS(obs, mod, minval, maxval):
 
     """
     a, b, c, d = scores(obs, mod, minval, maxval=maxval)
-    ar = (a + b) * (a + c) / (a + b + c + d)
-    ets = (a - ar) / (a + b + c - ar)
-    print('ETS for range ' + str(minval) + ' --> ' + str(maxval) + ': ' + ets)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ar = (a + b) * (a + c) / (a + b + c + d)
+        ets = (a - ar) / (a + b + c - ar)
+    print('ETS for range {} --> {}: {}'.format(minval, maxval, ets))
     return ets
 
 
 def scores(obs, mod, minval, maxval=1.0e5):
-    """Short summary.
+    """Contingency table of the events minval < value < maxval.
 
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    minval : type
-        Description of parameter `minval`.
-    maxval : type
-        Description of parameter `maxval`.
+    obs : array-like
+        observations.
+    mod : array-like
+        predictions.
+    minval : float
+        event threshold.
+    maxval : float
+        upper bound of the events.
 
     Returns
     -------
-    type
-        Description of returned object.
+    tuple
+        (a, b, c, d) hits, misses, false alarms and correct negatives of the
+        valid pairs (see contingency_counts).
+
+    """
+    a, b, c, d = contingency_counts(obs, mod, [minval], maxval=maxval)
+    return float(a[0]), float(b[0]), float(c[0]), float(d[0])
+
+
+def _count_above(x, thresholds):
+    """Number of values of x above each threshold (one sort)."""
+    x = np.sort(x)
+    return len(x) - np.searchsorted(x, thresholds, side='right')
+
+
+def contingency_counts(obs, mod, thresholds, maxval=None):
+    """Contingency tables of exceedance events at many thresholds at once.
+
+    An event is value > threshold (and value < maxval).  Obs, mod and the
+    pairwise minimum are sorted once and the counts of every threshold are
+    read with searchsorted: a hit is a pair whose minimum exceeds the
+    threshold.
+
+    Parameters
+    ----------
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    thresholds : array-like
+        event thresholds.
+    maxval : float
+        exclusive upper bound of the events.
+
+    Returns
+    -------
+    tuple
+        (hits, misses, false_alarms, correct_negatives) arrays with one
+        value per threshold, counted over the valid pairs.
 
     """
-    d = {}
-    d['obs'] = obs
-    d['mod'] = mod
-    df = DataFrame(d)
-    ct = crosstab(
-        (df['mod'] > minval) & (df['mod'] < maxval),
-        (df['obs'] > minval) & (df['obs'] < maxval),
-        margins=True)
-    #    print ct
-    a = ct[1][1].astype('float')
-    b = ct[1][0].astype('float')
-    c = ct[0][1].astype('float')
-    d = ct[0][0].astype('float')
-    return a, b, c, d
+    o, m, valid = _paired(obs, mod)
+    o = o[valid]
+    m = m[valid]
+    t = np.atleast_1d(np.asarray(thresholds, dtype='float64'))
+    lo = np.minimum(o, m)
+    nobs = _count_above(o, t)
+    nmod = _count_above(m, t)
+    hits = _count_above(lo, t)
+    if maxval is not None:
+        # remove the events reaching maxval
+        nobs -= _count_above(o[o >= maxval], t)
+        nmod -= _count_above(m[m >= maxval], t)
+        hits -= _count_above(lo[np.maximum(o, m) >= maxval], t)
+    misses = nobs - hits
+    false_alarms = nmod - hits
+    correct_negatives = len(o) - hits - misses - false_alarms
+    return hits, misses, false_alarms, correct_negatives
 
 
-def stats(df, minval, maxval):
+def _categorical_scores(a, b, c, d):
+    """Categorical scores from the contingency counts (numpy or xarray)."""
+    a, b, c, d = [i * 1. for i in [a, b, c, d]]
+    n = a + b + c + d
+    out = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['POD'] = a / (a + b)
+        out['FAR'] = c / (a + c)
+        out['SR'] = a / (a + c)
+        out['POFD'] = c / (c + d)
+        out['CSI'] = a / (a + b + c)
+        out['BIAS'] = (a + c) / (a + b)
+        out['HSS'] = 2 * (a * d - b * c) / ((a + c) * (c + d) + (a + b) *
+                                            (b + d))
+        ar = (a + b) * (a + c) / n
+        out['ETS'] = (a - ar) / (a + b + c - ar)
+    return out
+
+
+def categorical_scores(obs, mod, thresholds, maxval=None):
+    """Contingency tables and categorical scores at many thresholds.
+
+    The columns give the ROC curve (POFD, POD) and the performance diagram
+    (SR, POD) over the thresholds.
+
+    Parameters
+    ----------
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    thresholds : array-like
+        event thresholds (value > threshold).
+    maxval : float
+        exclusive upper bound of the events.
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by threshold with the hits, misses, false_alarms and
+        correct_negatives counts, POD, FAR, SR (success ratio), POFD, CSI,
+        BIAS (frequency bias), HSS and ETS.
+
+    """
+    t = np.atleast_1d(np.asarray(thresholds, dtype='float64'))
+    a, b, c, d = contingency_counts(obs, mod, t, maxval=maxval)
+    df = DataFrame({
+        'hits': a,
+        'misses': b,
+        'false_alarms': c,
+        'correct_negatives': d
+    },
+                   index=t)
+    df.index.name = 'threshold'
+    for k, v in _categorical_scores(a, b, c, d).items():
+        df[k] = v
+    return df
+
+
+def _block_counts(obs, mod, thresholds, maxval=None, nreduce=1):
+    """Contingency counts of one block, reduced over its last `nreduce` axes.
+
+    Each value gets the number of (sorted) thresholds it exceeds and the
+    counts of all the thresholds come from one bincount per cell, so no
+    boolean array per threshold is built.
+
+    Returns
+    -------
+    numpy.array
+        (4, threshold, kept axes..., 1 per reduced axis) hits, misses,
+        false alarms and correct negatives.
+    """
+    o, m, valid = _paired(obs, mod)
+    keep = o.shape[:o.ndim - nreduce]
+    ncell = int(np.prod(keep))
+    nt = len(thresholds)
+    o = o.reshape(ncell, -1)
+    m = m.reshape(ncell, -1)
+    valid = valid.reshape(ncell, -1)
+    cell = np.arange(ncell)[:, None] * (nt + 2)
+
+    def _above(x, ok):
+        # number of thresholds below x, nt + 1 for the invalid pairs
+        code = np.searchsorted(thresholds, x, side='left')
+        code = np.where(ok, code, 0)
+        code = np.where(valid, code, nt + 1)
+        n = np.bincount((cell + code).ravel(), minlength=ncell * (nt + 2))
+        n = n.reshape(ncell, nt + 2)[:, :nt + 1]
+        # values above threshold j have a code > j
+        return np.cumsum(n[:, ::-1], axis=1)[:, ::-1][:, 1:].T
+
+    with np.errstate(invalid='ignore'):
+        if maxval is None:
+            ok_o = ok_m = ok_lo = True
+        else:
+            ok_o = o < maxval
+            ok_m = m < maxval
+            ok_lo = ok_o & ok_m
+        hits = _above(np.minimum(o, m), ok_lo)
+        nobs = _above(o, ok_o)
+        nmod = _above(m, ok_m)
+    n = valid.sum(axis=1)[None, :]
+    misses = nobs - hits
+    false_alarms = nmod - hits
+    out = np.stack(
+        [hits, misses, false_alarms, n - hits - misses - false_alarms])
+    return out.reshape((4, nt) + keep + (1, ) * nreduce)
+
+
+def contingency_maps(obs,
+                     mod,
+                     thresholds,
+                     dim=None,
+                     maxval=None,
+                     scores=True):
+    """Contingency counts of gridded exceedance forecasts at many thresholds.
+
+    Dask inputs are counted block by block (dask.array.map_blocks) and the
+    block counts are summed over the reduced dimensions, so only one block
+    is in memory at a time and the result stays lazy.
+
+    Parameters
+    ----------
+    obs : xarray.DataArray
+        observed or analysis field with NaN as missing values.
+    mod : xarray.DataArray
+        forecast aligned with `obs`.
+    thresholds : array-like
+        event thresholds (value > threshold), ie [35.] for PM2.5 or [70.]
+        for O3.
+    dim : str or list of str
+        dimensions to reduce.  None reduces all of them (domain totals), ie
+        'time' gives per cell maps.
+    maxval : float
+        exclusive upper bound of the events.
+    scores : bool
+        add the categorical scores (see categorical_scores).
+
+    Returns
+    -------
+    xarray.Dataset
+        hits, misses, false_alarms and correct_negatives (and the scores)
+        over (threshold, remaining dimensions).
+
+    """
+    import xarray as xr
+    t = np.unique(np.asarray(thresholds, dtype='float64'))
+    obs, mod = xr.align(obs, mod, join='inner')
+    if dim is None:
+        dims = list(obs.dims)
+    else:
+        dims = [dim] if isinstance(dim, str) else list(dim)
+    keep = [i for i in obs.dims if i not in dims]
+    obs = obs.transpose(*(keep + dims))
+    mod = mod.transpose(*(keep + dims))
+    red = tuple(range(2 + len(keep), 2 + obs.ndim))
+    kwargs = dict(thresholds=t, maxval=maxval, nreduce=len(dims))
+    if obs.chunks is None and mod.chunks is None:
+        counts = _block_counts(obs.values, mod.values, **kwargs).sum(axis=red)
+    else:
+        import dask.array as dsa
+        if obs.chunks is None:
+            obs = obs.chunk(dict(zip(mod.dims, mod.chunks)))
+        mod = mod.chunk(dict(zip(obs.dims, obs.chunks)))
+        chunks = ((4, ), (len(t), )) + obs.chunks[:len(keep)] + tuple(
+            (1, ) * len(c) for c in obs.chunks[len(keep):])
+        counts = dsa.map_blocks(_block_counts,
+                                obs.data,
+                                mod.data,
+                                dtype='int64',
+                                chunks=chunks,
+                                new_axis=[0, 1],
+                                **kwargs).sum(axis=red)
+    coords = {
+        k: v
+        for k, v in obs.coords.items() if not set(v.dims) & set(dims)
+    }
+    coords['threshold'] = t
+    out_dims = ['threshold'] + keep
+    names = ['hits', 'misses', 'false_alarms', 'correct_negatives']
+    dset = xr.Dataset(
+        {k: (out_dims, counts[n])
+         for n, k in enumerate(names)},
+        coords=coords)
+    if scores:
+        for k, v in _categorical_scores(*[dset[i] for i in names]).items():
+            dset[k] = v
+    dset.attrs['obs'] = str(obs.name)
+    dset.attrs['model'] = str(mod.name)
+    if maxval is not None:
+        dset.attrs['maxval'] = maxval
+    return dset
+
+
+def roc_area(table):
+    """Area under the ROC curve of categorical_scores.
+
+    Parameters
+    ----------
+    table : pandas.DataFrame
+        output of categorical_scores.
+
+    Returns
+    -------
+    float
+        trapezoidal area of the (POFD, POD) points closed by (0, 0) and
+        (1, 1).
+
+    """
+    x = np.r_[0., table['POFD'].values, 1.]
+    y = np.r_[0., table['POD'].values, 1.]
+    ok = np.isfinite(x) & np.isfinite(y)
+    x, y = x[ok], y[ok]
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    return float(np.sum((x[1:] - x[:-1]) * (y[1:] + y[:-1]) / 2.))
+
+
+def stats(df, minval, maxval, obs='Obs', mod='CMAQ'):
     """Short summary.
 
     Parameters
@@ -1775,6 +2021,10 @@ def stats(df, minval, maxval):
         Description of parameter `minval`.
     maxval : type
         Description of parameter `maxval`.
+    obs : str
+        observation column.
+    mod : str
+        prediction column.  See grouped_stats for metrics per group.
 
     Returns
     -------
@@ -1784,19 +2034,1089 @@ def stats(df, minval, maxval):
     """
     from numpy import sqrt
     dd = {}
-    dd['N'] = df.Obs.dropna().count()
-    dd['Obs'] = df.Obs.mean()
-    dd['Mod'] = df.CMAQ.mean()
-    dd['MB'] = MB(df.Obs.values, df.CMAQ.values)  # mean bias
-    dd['R'] = sqrt(R2(df.Obs.values, df.CMAQ.values))  # pearsonr ** 2
-    dd['IOA'] = IOA(df.Obs.values, df.CMAQ.values)  # Index of Agreement
-    dd['RMSE'] = RMSE(df.Obs.values, df.CMAQ.values)
-    dd['NMB'] = NMB(df.Obs.values, df.CMAQ.values)
+    dd['N'] = df[obs].dropna().count()
+    dd['Obs'] = df[obs].mean()
+    dd['Mod'] = df[mod].mean()
+    dd['MB'] = MB(df[obs].values, df[mod].values)  # mean bias
+    dd['R'] = sqrt(R2(df[obs].values, df[mod].values))  # pearsonr ** 2
+    dd['IOA'] = IOA(df[obs].values, df[mod].values)  # Index of Agreement
+    dd['RMSE'] = RMSE(df[obs].values, df[mod].values)
+    dd['NMB'] = NMB(df[obs].values, df[mod].values)
     try:
-        a, b, c, d = scores(df.Obs.values, df.CMAQ.values, 70, 1000)
+        a, b, c, d = scores(df[obs].values, df[mod].values, 70, 1000)
         dd['POD'] = a / (a + b)
         dd['FAR'] = c / (a + c)
     except:
         dd['POD'] = 1.
         dd['FAR'] = 0.
     return dd
+
+
+# ---------------------------------------------------------------------------
+# fused statistics engine
+# ---------------------------------------------------------------------------
+def _paired(obs, mod):
+    """Float arrays of the valid pairs and the joint validity mask.
+
+    A pair is valid when both values are finite and not masked.  Invalid
+    values are set to NaN in the returned arrays.
+    """
+    o = np.asarray(np.ma.getdata(obs), dtype='float64')
+    m = np.asarray(np.ma.getdata(mod), dtype='float64')
+    o, m = np.broadcast_arrays(o, m)
+    valid = np.isfinite(o) & np.isfinite(m)
+    # masks are only built for masked inputs
+    for x in [obs, mod]:
+        if np.ma.is_masked(x):
+            valid &= ~np.ma.getmaskarray(x)
+    return np.where(valid, o, np.nan), np.where(valid, m, np.nan), valid
+
+
+class _AxisReducer(object):
+    """Reductions of _moments along an array axis."""
+
+    def __init__(self, axis=None):
+        self.axis = axis
+
+    def sum(self, x, valid):
+        return np.where(valid, x, 0.).sum(axis=self.axis)
+
+    def count(self, valid):
+        return valid.sum(axis=self.axis, dtype='float64')
+
+    def max(self, x, valid):
+        return np.where(valid, x, -np.inf).max(axis=self.axis)
+
+    def expand(self, x):
+        """Broadcasts a reduced array back to the data."""
+        if self.axis is None:
+            return x
+        return np.expand_dims(x, axis=self.axis)
+
+
+class _SegmentReducer(object):
+    """Reductions of _moments over contiguous segments (sorted groups) of 1D
+    arrays with np.add.reduceat."""
+
+    def __init__(self, starts, counts):
+        self.starts = starts
+        self.counts = counts
+
+    def sum(self, x, valid):
+        return np.add.reduceat(np.where(valid, x, 0.), self.starts)
+
+    def count(self, valid):
+        return np.add.reduceat(valid.astype('float64'), self.starts)
+
+    def max(self, x, valid):
+        return np.maximum.reduceat(np.where(valid, x, -np.inf), self.starts)
+
+    def expand(self, x):
+        return np.repeat(x, self.counts)
+
+
+def _moments(o, m, valid, red, obs_ref=None, groups=None):
+    """Sufficient statistics of the valid pairs with the reducer `red`.
+
+    The first pass gives the counts and means, the second one the centered
+    second moments and the other sums the metrics are derived from.  Only
+    the sums of `groups` (see _moment_groups) are computed, all of them if
+    None.
+    """
+    if groups is None:
+        groups = _all_groups
+    s = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = red.count(valid)
+        s['n'] = n
+        s['mo'] = red.sum(o, valid) / n
+        s['mm'] = red.sum(m, valid) / n
+        # reference obs mean of the d1, E1, IOA and AC terms, the mean of
+        # the data where it is missing
+        ref = s['mo'] if obs_ref is None else np.asarray(obs_ref, 'float64')
+        s['ref'] = np.where(np.isnan(ref), s['mo'], ref)
+        if 'centered' in groups:
+            do = o - red.expand(s['mo'])
+            dm = m - red.expand(s['mm'])
+            s['co2'] = red.sum(do * do, valid)
+            s['cm2'] = red.sum(dm * dm, valid)
+            s['com'] = red.sum(do * dm, valid)
+        if 'error' in groups or 'ratio' in groups or 'fraction' in groups:
+            d = m - o
+            ad = np.abs(d)
+        if 'error' in groups:
+            s['sad'] = red.sum(ad, valid)
+            s['sd2'] = red.sum(d * d, valid)
+        # ratios, only the finite values are kept as with np.ma.masked_invalid
+        if 'ratio' in groups:
+            nb = d / o
+            ok = valid & np.isfinite(nb)
+            s['nnb'] = red.count(ok)
+            s['snb'] = red.sum(nb, ok)
+            s['sne'] = red.sum(ad / o, ok)
+        if 'fraction' in groups:
+            fb = d / (m + o)
+            ok = valid & np.isfinite(fb)
+            s['nfb'] = red.count(ok)
+            s['sfb'] = red.sum(fb, ok)
+            s['sfe'] = red.sum(ad / (m + o), ok)
+        if 'inverse' in groups:
+            rm = o / m
+            ok = valid & np.isfinite(rm)
+            s['nrm'] = red.count(ok)
+            s['srm'] = red.sum(rm, ok)
+        if 'peak' in groups:
+            s['maxo'] = red.max(o, valid)
+            s['maxm'] = red.max(m, valid)
+        # index of agreement terms around the (reference) obs mean
+        if 'agreement' in groups:
+            ref = red.expand(s['ref'])
+            am = np.abs(m - ref)
+            ao = np.abs(o - ref)
+            s['sd1'] = red.sum(am + ao, valid)
+            s['se1'] = red.sum(ao, valid)
+            s['sioa'] = red.sum((am + ao)**2, valid)
+        # wind direction differences
+        if 'wind' in groups:
+            cb = circlebias_m(m - o)
+            s['swb'] = red.sum(cb, valid)
+            s['swe'] = red.sum(np.abs(cb), valid)
+            s['sw2'] = red.sum(cb * cb, valid)
+    return s
+
+
+def _sufficient_stats(obs, mod, axis=None, obs_ref=None, groups=None):
+    """Sufficient statistics of the paired obs and mod along `axis`.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        observations and predictions (numpy, masked or with NaN).
+    axis : int
+        reduction axis.  None reduces all the values.
+    obs_ref : float or array-like
+        reference observation mean of the d1, E1, IOA and AC denominators.
+        Defaults to the mean of the paired observations.
+    groups : set of str
+        groups of sums to compute (see _moment_groups).  None computes all.
+
+    Returns
+    -------
+    dict
+        moments keyed by name (see _moment_metrics).
+
+    """
+    o, m, valid = _paired(obs, mod)
+    return _moments(o,
+                    m,
+                    valid,
+                    _AxisReducer(axis),
+                    obs_ref=obs_ref,
+                    groups=groups)
+
+
+def _corr(s):
+    return s['com'] / np.sqrt(s['co2'] * s['cm2'])
+
+
+def _slope(s):
+    return s['com'] / s['co2']
+
+
+# metrics derived from the moments of _sufficient_stats
+_moment_metrics = {
+    'N': lambda s: s['n'],
+    'NOP': lambda s: s['n'],
+    'MO': lambda s: s['mo'],
+    'MP': lambda s: s['mm'],
+    'STDO': lambda s: np.sqrt(s['co2'] / s['n']),
+    'STDP': lambda s: np.sqrt(s['cm2'] / s['n']),
+    'MB': lambda s: s['mm'] - s['mo'],
+    'ME': lambda s: s['sad'] / s['n'],
+    'RMSE': lambda s: np.sqrt(s['sd2'] / s['n']),
+    'NMB': lambda s: (s['mm'] - s['mo']) / s['mo'] * 100.,
+    'NMB_ABS': lambda s: (s['mm'] - s['mo']) / np.abs(s['mo']) * 100.,
+    'NME': lambda s: s['sad'] / (s['mo'] * s['n']) * 100.,
+    'NMdnGE': lambda s: s['sad'] / (s['mo'] * s['n']) * 100.,
+    'MNB': lambda s: s['snb'] / s['nnb'] * 100.,
+    'MNE': lambda s: s['sne'] / s['nnb'] * 100.,
+    'FB': lambda s: s['sfb'] / s['nfb'] * 200.,
+    'FE': lambda s: s['sfe'] / s['nfb'] * 200.,
+    'RM': lambda s: s['srm'] / s['nrm'],
+    'R': _corr,
+    'R2': lambda s: _corr(s)**2,
+    # regression mod_hat = mm + slope * (obs - mo)
+    'RMSEs': lambda s: np.sqrt((_slope(s) - 1.)**2 * s['co2'] / s['n'] +
+                               (s['mm'] - s['mo'])**2),
+    'RMSEu': lambda s: np.sqrt(
+        np.maximum(s['cm2'] - s['com']**2 / s['co2'], 0.) / s['n']),
+    'd1': lambda s: 1. - s['sad'] / s['sd1'],
+    'E1': lambda s: 1. - s['sad'] / s['se1'],
+    'IOA': lambda s: 1. - s['sd2'] / s['sioa'],
+    'AC': lambda s: (s['com'] + s['n'] * (s['mo'] - s['ref']) *
+                     (s['mm'] - s['ref'])) / np.sqrt(
+                         (s['cm2'] + s['n'] * (s['mm'] - s['ref'])**2) *
+                         (s['co2'] + s['n'] * (s['mo'] - s['ref'])**2)),
+    'USUTPB': lambda s: (s['maxm'] - s['maxo']) / s['maxo'] * 100.,
+    'USUTPE': lambda s: np.abs(s['maxm'] - s['maxo']) / s['maxo'] * 100.,
+    'WDMB': lambda s: s['swb'] / s['n'],
+    'WDME': lambda s: s['swe'] / s['n'],
+    'WDRMSE': lambda s: np.sqrt(s['sw2'] / s['n']),
+}
+
+# groups of sums of _moments beyond the counts and means needed by the
+# moment based metrics
+_moment_groups = {
+    'STDO': ['centered'],
+    'STDP': ['centered'],
+    'ME': ['error'],
+    'RMSE': ['error'],
+    'NME': ['error'],
+    'NMdnGE': ['error'],
+    'MNB': ['ratio'],
+    'MNE': ['ratio'],
+    'FB': ['fraction'],
+    'FE': ['fraction'],
+    'RM': ['inverse'],
+    'R': ['centered'],
+    'R2': ['centered'],
+    'RMSEs': ['centered'],
+    'RMSEu': ['centered'],
+    'd1': ['error', 'agreement'],
+    'E1': ['error', 'agreement'],
+    'IOA': ['error', 'agreement'],
+    'AC': ['centered'],
+    'USUTPB': ['peak'],
+    'USUTPE': ['peak'],
+    'WDMB': ['wind'],
+    'WDME': ['wind'],
+    'WDRMSE': ['wind'],
+}
+_all_groups = set(g for i in _moment_groups.values() for g in i)
+
+
+def _needed_groups(metrics):
+    """Groups of sums of _moments needed by the moment based `metrics`."""
+    return set(g for i in metrics for g in _moment_groups.get(i, []))
+
+
+# metrics that need order statistics (medians)
+_median_metrics = {
+    'MdnO': lambda o, m: o,
+    'MdnP': lambda o, m: m,
+    'MdnB': lambda o, m: m - o,
+    'MdnE': lambda o, m: np.abs(m - o),
+    'MdnNB': lambda o, m: (m - o) / o * 100.,
+    'MdnNE': lambda o, m: np.abs(m - o) / o * 100.,
+    'RMdn': lambda o, m: o / m,
+    'WDMdnB': lambda o, m: circlebias_m(m - o),
+    'WDMdnE': lambda o, m: np.abs(circlebias_m(m - o)),
+}
+# ratios of medians
+_median_ratios = {
+    'NMdnB': ('MdnB', 'MdnO'),
+    'NMdnE': ('MdnE', 'MdnO'),
+}
+
+moment_metrics = list(_moment_metrics.keys())
+median_metrics = list(_median_metrics.keys()) + list(_median_ratios.keys())
+default_metrics = [
+    'N', 'MO', 'MP', 'MB', 'NMB', 'ME', 'NME', 'RMSE', 'R', 'IOA', 'FB', 'FE'
+]
+
+
+def _median(x, axis=None):
+    """nanmedian of the finite values (inf are dropped as NaN)."""
+    import warnings
+    x = np.where(np.isfinite(x), x, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(x, axis=axis)
+
+
+def _metrics_from_moments(s, metrics):
+    """Evaluates the moment based `metrics` from the moments `s`."""
+    out = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in metrics:
+            out[name] = _moment_metrics[name](s)
+    return out
+
+
+def _median_stats(o, m, metrics, axis=None, median=_median):
+    """Evaluates the median based `metrics` from the paired arrays (NaN for
+    invalid pairs)."""
+    out = {}
+    cache = {}
+
+    def _get(name):
+        if name not in cache:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cache[name] = median(_median_metrics[name](o, m), axis=axis)
+        return cache[name]
+
+    for name in metrics:
+        if name in _median_ratios:
+            num, den = _median_ratios[name]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[name] = _get(num) / _get(den) * 100.
+        else:
+            out[name] = _get(name)
+    return out
+
+
+def _check_metrics(metrics):
+    if metrics is None:
+        metrics = default_metrics
+    if isinstance(metrics, str):
+        metrics = [metrics]
+    unknown = [
+        i for i in metrics if i not in _moment_metrics and i not in
+        median_metrics
+    ]
+    if len(unknown) > 0:
+        raise ValueError('unknown metrics: ' + ', '.join(unknown))
+    return list(metrics)
+
+
+def compute_stats(obs,
+                  mod,
+                  metrics=None,
+                  axis=None,
+                  obs_ref=None,
+                  compression=None):
+    """Computes many metrics of paired observations and predictions at once.
+
+    The moment based metrics are derived from shared sums (counts, means,
+    centered second moments, absolute and normalized error sums, ...): one
+    pass gives the means, then only the sums the requested metrics need are
+    reduced.  Only the median based metrics sort the data.
+
+    Pairs are used when both values are valid (finite and not masked), so
+    MO and MP are the means of the paired values.  Ratio metrics (MNB, MNE,
+    FB, FE, RM, MdnNB, MdnNE and RMdn) skip the pairs with a non finite
+    ratio as np.ma.masked_invalid does.
+
+    Parameters
+    ----------
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions, broadcastable to `obs`.
+    metrics : list of str
+        names of the metrics (see moment_metrics and median_metrics).
+        Defaults to default_metrics.
+    axis : int
+        axis to reduce.  None reduces all the values.
+    obs_ref : float or array-like
+        reference observation mean of d1, E1, IOA and AC.  Defaults to the
+        mean of the paired observations.
+    compression : float
+        if given, the median based metrics use a t-digest of this
+        compression (see sketch.TDigest) instead of sorting the data.
+
+    Returns
+    -------
+    dict
+        {metric: value}, values are arrays when `axis` is given.
+
+    """
+    metrics = _check_metrics(metrics)
+    mmet = [i for i in metrics if i in _moment_metrics]
+    out = {}
+    if len(mmet) > 0:
+        s = _sufficient_stats(obs,
+                              mod,
+                              axis=axis,
+                              obs_ref=obs_ref,
+                              groups=_needed_groups(mmet))
+        out.update(_metrics_from_moments(s, mmet))
+    dmet = [i for i in metrics if i in median_metrics]
+    if len(dmet) > 0:
+        o, m, _ = _paired(obs, mod)
+        median = _median
+        if compression is not None:
+            from .sketch import quantile
+
+            def median(x, axis=None):
+                return quantile(x, 0.5, axis=axis, compression=compression)
+
+        out.update(_median_stats(o, m, dmet, axis=axis, median=median))
+    return {k: out[k] for k in metrics}
+
+
+def _segment_median(x, codes, ngroups):
+    """Median of the finite values of `x` in each group (codes sorted)."""
+    x = np.where(np.isfinite(x), x, np.nan)
+    good = ~np.isnan(x)
+    k = np.bincount(codes[good], minlength=ngroups)
+    # sort by value (NaN last), then a stable (radix) sort by group
+    order = np.argsort(x)
+    ctype = np.int16 if ngroups < 2**15 else np.int64
+    order = order[np.argsort(codes[order].astype(ctype), kind='stable')]
+    xs = x[order]
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes,
+                                                        minlength=ngroups))])
+    lo = starts[:-1] + np.maximum(k - 1, 0) // 2
+    hi = starts[:-1] + k // 2
+    with np.errstate(invalid='ignore'):
+        med = (xs[np.minimum(lo, len(xs) - 1)] +
+               xs[np.minimum(hi, len(xs) - 1)]) / 2.
+    return np.where(k > 0, med, np.nan)
+
+
+_time_keys = {
+    'hour': lambda t: t.dt.hour,
+    'dayofweek': lambda t: t.dt.dayofweek,
+    'month': lambda t: t.dt.month,
+    'year': lambda t: t.dt.year,
+    'season': lambda t: t.dt.month.map({
+        12: 'DJF',
+        1: 'DJF',
+        2: 'DJF',
+        3: 'MAM',
+        4: 'MAM',
+        5: 'MAM',
+        6: 'JJA',
+        7: 'JJA',
+        8: 'JJA',
+        9: 'SON',
+        10: 'SON',
+        11: 'SON'
+    })
+}
+
+
+def _group_keys(df, by, time='time'):
+    """DataFrame of the grouping keys `by` (columns or derived time keys)."""
+    import pandas as pd
+    keys = {}
+    for name in by:
+        if name in df.columns:
+            keys[name] = df[name]
+        elif name in _time_keys:
+            keys[name] = _time_keys[name](pd.to_datetime(df[time]))
+        else:
+            raise KeyError(name + ' is not a column of the DataFrame')
+    return pd.DataFrame(keys, index=df.index)
+
+
+def grouped_stats(df,
+                  obs='obs',
+                  mod='model',
+                  by='siteid',
+                  metrics=None,
+                  time='time',
+                  tidy=True):
+    """Computes metrics for every group of a paired DataFrame at once.
+
+    Rows are sorted once by group code and the moments of compute_stats are
+    reduced per group with np.add.reduceat.  Medians use one lexsort of
+    (group, value).  No Python loop runs over the groups.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        paired observations and predictions.
+    obs : str
+        observation column.
+    mod : str
+        prediction column.
+    by : str or list of str
+        grouping columns (ie 'siteid', 'EPA_ACRO').  'hour', 'dayofweek',
+        'month', 'year' and 'season' are derived from the `time` column
+        when they are not columns of `df`.
+    metrics : list of str
+        metric names (see compute_stats).
+    time : str
+        time column used for the derived time keys (ie 'time_local').
+    tidy : bool
+        if True, return one row per (group, metric) with a `value` column,
+        else one row per group with one column per metric.
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    """
+    import pandas as pd
+    metrics = _check_metrics(metrics)
+    if isinstance(by, str):
+        by = [by]
+    g = _group_keys(df, by, time).groupby(by,
+                                          sort=True,
+                                          observed=True,
+                                          dropna=True)
+    codes = g.ngroup().values
+    index = g.size().index
+    keep = codes >= 0
+    ngroups = len(index)
+    if ngroups == 0:
+        wide = pd.DataFrame(columns=by + metrics)
+        if not tidy:
+            return wide
+        return pd.DataFrame(columns=by + ['metric', 'value'])
+    codes = codes[keep].astype(np.int16 if ngroups < 2**15 else np.int64)
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    o, m, valid = _paired(df[obs].values[keep][order],
+                          df[mod].values[keep][order])
+    counts = np.bincount(codes, minlength=ngroups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    out = {}
+    mmet = [i for i in metrics if i in _moment_metrics]
+    if len(mmet) > 0:
+        s = _moments(o,
+                     m,
+                     valid,
+                     _SegmentReducer(starts, counts),
+                     groups=_needed_groups(mmet))
+        out.update(_metrics_from_moments(s, mmet))
+    dmet = [i for i in metrics if i in median_metrics]
+    if len(dmet) > 0:
+
+        def _median(x, axis=None):
+            return _segment_median(x, codes, ngroups)
+
+        out.update(_median_stats(o, m, dmet, median=_median))
+    wide = pd.DataFrame({k: out[k] for k in metrics}, index=index)
+    wide = wide.reset_index()
+    if not tidy:
+        return wide
+    return wide.melt(id_vars=by, var_name='metric', value_name='value')
+
+
+class StatsAccumulator(object):
+    """Mergeable streaming accumulator of the metrics.
+
+    Chunks are added with update() and accumulators of other chunks or
+    processes are combined with merge() (or +).  Means and centered second
+    moments are combined with the Welford/Chan pairwise updates, the other
+    sums are additive and the peaks use max, so merging is associative and
+    the result does not depend on how the data were split.
+
+    d1, E1 and IOA need the mean observation of all the data.  Their terms
+    are accumulated around `obs_ref` and are exact when `obs_ref` is the
+    final mean (ie a climatological mean computed beforehand).  If None, the
+    mean of the first chunk with valid pairs is used.  Accumulators built
+    separately then have different references: the `mixed` field flags
+    them and their merge has NaN d1, E1 and IOA.  Pass the same `obs_ref`
+    to all of them to keep these metrics.  AC is anomaly correlation about
+    `obs_ref`, or about the exact mean of all the data when it is None.
+
+    With `compression`, the median based metrics are streamed too, from one
+    t-digest per median quantity (see sketch.TDigest).  They are exact until
+    the digests hold more than `exact_size` values.
+
+    Parameters
+    ----------
+    obs_ref : float or array-like
+        reference observation mean of d1, E1 and IOA.
+    axis : int
+        axis of the chunks to reduce.  None reduces the whole chunk, an axis
+        keeps maps (ie axis=0 on (time, y, x) chunks gives (y, x) metrics).
+    compression : float
+        accuracy setting of the median sketches.  If None, only the moment
+        based metrics are available.  Needs axis=None.
+    exact_size : int
+        number of values the sketches keep exactly.
+
+    """
+
+    # moments of _moments, merged with Chan's update or summed
+    _centered = ['co2', 'cm2', 'com']
+    _additive = [
+        'sad', 'sd2', 'nnb', 'snb', 'sne', 'nfb', 'sfb', 'sfe', 'nrm', 'srm',
+        'sd1', 'se1', 'sioa', 'swb', 'swe', 'sw2'
+    ]
+    _maxima = ['maxo', 'maxm']
+    # IOA terms accumulated around different references
+    _mixed = ['sd1', 'se1', 'sioa']
+    fields = ['n', 'mo', 'mm', 'ref', 'mixed'
+              ] + _centered + _additive + _maxima
+
+    def __init__(self,
+                 obs_ref=None,
+                 axis=None,
+                 compression=None,
+                 exact_size=None):
+        from .sketch import TDigest
+        self.obs_ref = obs_ref
+        self.axis = axis
+        self.state = None
+        self.digests = None
+        if compression is not None:
+            if axis is not None:
+                raise ValueError('median sketches need axis=None')
+            self.digests = {
+                k: TDigest(compression=compression, exact_size=exact_size)
+                for k in _median_metrics
+            }
+
+    def update(self, obs, mod):
+        """Adds a chunk of paired observations and predictions.
+
+        Parameters
+        ----------
+        obs, mod : array-like
+            observations and predictions (numpy, masked or with NaN).
+
+        Returns
+        -------
+        StatsAccumulator
+            self.
+
+        """
+        # the first valid pairs fix the reference of the IOA terms
+        ref = self.obs_ref
+        if ref is None and self.state is not None:
+            ref = self.state['ref']
+        o, m, valid = _paired(obs, mod)
+        s = _moments(o, m, valid, _AxisReducer(self.axis), obs_ref=ref)
+        s['mixed'] = np.zeros(np.shape(s['ref']), dtype=bool)
+        if self.digests is not None:
+            o, m = o[valid], m[valid]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for k, digest in self.digests.items():
+                    digest.update(_median_metrics[k](o, m))
+        self.state = s if self.state is None else self._combine(
+            self.state, s)
+        return self
+
+    @classmethod
+    def _combine(cls, a, b):
+        # the IOA terms of different references cannot be added, a NaN
+        # reference is an empty side
+        mixed = (np.asarray(a['mixed'], dtype=bool)
+                 | np.asarray(b['mixed'], dtype=bool)
+                 | (~np.isclose(a['ref'], b['ref']) & ~np.isnan(a['ref'])
+                    & ~np.isnan(b['ref'])))
+        out = {}
+        na, nb = a['n'], b['n']
+        n = na + nb
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fa = np.where(n > 0, na / n, 0.)
+            fb = np.where(n > 0, nb / n, 0.)
+            # empty sides have NaN means
+            mo_a, mo_b = np.nan_to_num(a['mo']), np.nan_to_num(b['mo'])
+            mm_a, mm_b = np.nan_to_num(a['mm']), np.nan_to_num(b['mm'])
+            do = mo_b - mo_a
+            dm = mm_b - mm_a
+            w = na * fb
+            out['n'] = n
+            out['mo'] = np.where(n > 0, mo_a + do * fb, np.nan)
+            out['mm'] = np.where(n > 0, mm_a + dm * fb, np.nan)
+            out['co2'] = a['co2'] + b['co2'] + do * do * w
+            out['cm2'] = a['cm2'] + b['cm2'] + dm * dm * w
+            out['com'] = a['com'] + b['com'] + do * dm * w
+        for k in cls._additive:
+            out[k] = a[k] + b[k]
+        for k in cls._maxima:
+            out[k] = np.maximum(a[k], b[k])
+        for k in cls._mixed:
+            out[k] = np.where(mixed, np.nan, out[k])
+        out['ref'] = np.where(np.isnan(a['ref']), b['ref'], a['ref'])
+        out['mixed'] = mixed
+        return out
+
+    def merge(self, other):
+        """Returns the accumulator of the data of self and `other`."""
+        out = StatsAccumulator(obs_ref=self.obs_ref, axis=self.axis)
+        if self.digests is not None and other.digests is not None:
+            out.digests = {
+                k: v.merge(other.digests[k])
+                for k, v in self.digests.items()
+            }
+        elif self.digests is not None or other.digests is not None:
+            raise ValueError('only accumulators with median sketches can be '
+                             'merged together')
+        if self.state is None:
+            out.state = other.state
+        elif other.state is None:
+            out.state = self.state
+        else:
+            out.state = self._combine(self.state, other.state)
+        return out
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def result(self, metrics=None):
+        """Metrics of the accumulated data.
+
+        Parameters
+        ----------
+        metrics : list of str
+            metric names (see moment_metrics and median_metrics).  The
+            median metrics need the sketches (`compression`).
+
+        Returns
+        -------
+        dict
+            {metric: value}.
+
+        """
+        metrics = _check_metrics(metrics)
+        median = [i for i in metrics if i not in _moment_metrics]
+        if len(median) > 0 and self.digests is None:
+            raise ValueError('median metrics need a quantile sketch: ' +
+                             ', '.join(median))
+        if self.state is None:
+            raise ValueError('no data were added')
+        s = self.state
+        if self.obs_ref is None:
+            # AC about the exact mean rather than the first chunk's one
+            s = dict(s, ref=s['mo'])
+        out = _metrics_from_moments(
+            s, [i for i in metrics if i in _moment_metrics])
+        if len(median) > 0:
+            medians = {k: v.median() for k, v in self.digests.items()}
+            for name in median:
+                if name in _median_ratios:
+                    num, den = _median_ratios[name]
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        out[name] = medians[num] / medians[den] * 100.
+                else:
+                    out[name] = medians[name]
+        return {k: out[k] for k in metrics}
+
+    def to_array(self):
+        """Compact float64 array of the moments (fields stacked on axis 0).
+
+        The median sketches are not included, see to_dict.
+        """
+        if self.state is None:
+            raise ValueError('no data were added')
+        return np.stack([np.asarray(self.state[k], dtype='float64')
+                         for k in self.fields])
+
+    @classmethod
+    def from_array(cls, array, axis=None, obs_ref=None):
+        """Rebuilds an accumulator from to_array()."""
+        out = cls(obs_ref=obs_ref, axis=axis)
+        out.state = {k: np.asarray(v) for k, v in zip(cls.fields, array)}
+        return out
+
+    def to_dict(self):
+        """JSON serializable state (with the median sketches)."""
+        out = {
+            'axis': self.axis,
+            'obs_ref': (None if self.obs_ref is None else
+                        np.asarray(self.obs_ref, dtype='float64').tolist()),
+            'state': {k: np.asarray(v).tolist()
+                      for k, v in self.state.items()}
+        }
+        if self.digests is not None:
+            out['digests'] = {k: v.to_dict() for k, v in self.digests.items()}
+        return out
+
+    @classmethod
+    def from_dict(cls, d):
+        """Rebuilds an accumulator from to_dict()."""
+        out = cls(obs_ref=d.get('obs_ref'), axis=d['axis'])
+        from .sketch import TDigest
+        out.state = {
+            k: np.asarray(v, dtype='float64') for k, v in d['state'].items()
+        }
+        if 'digests' in d:
+            out.digests = {
+                k: TDigest.from_dict(v)
+                for k, v in d['digests'].items()
+            }
+        return out
+
+
+def metric_maps(obs, mod, dim='time', metrics=None):
+    """Metric maps of paired DataArrays reduced over named dimensions.
+
+    The fused kernel of compute_stats is applied with xarray.apply_ufunc
+    (dask='parallelized'): each chunk of the other dimensions (ie a (y, x)
+    tile) is reduced on its own, so dask inputs stay lazy and only whole
+    series of a tile are held in memory at once.  Dask inputs are put in a
+    single chunk along `dim`.
+
+    Parameters
+    ----------
+    obs : xarray.DataArray
+        observations (or reanalysis) with NaN as missing values.
+    mod : xarray.DataArray
+        predictions aligned with `obs`.
+    dim : str or list of str
+        dimensions to reduce (ie 'time' for (y, x) maps or ['y', 'x'] for
+        time series of domain statistics).
+    metrics : list of str
+        names of the metrics (see moment_metrics and median_metrics).
+        Defaults to default_metrics.
+
+    Returns
+    -------
+    xarray.Dataset
+        one variable per metric over the remaining dimensions.
+
+    """
+    import xarray as xr
+    metrics = _check_metrics(metrics)
+    dims = [dim] if isinstance(dim, str) else list(dim)
+    obs, mod = xr.align(obs, mod, join='inner')
+    if obs.chunks is not None or mod.chunks is not None:
+        obs = obs.chunk({d: -1 for d in dims})
+        mod = mod.chunk({d: -1 for d in dims})
+
+    def _func(o, m):
+        # the core dimensions are last, flattened into one axis
+        shape = o.shape[:o.ndim - len(dims)] + (-1, )
+        out = compute_stats(o.reshape(shape),
+                            m.reshape(shape),
+                            metrics=metrics,
+                            axis=-1)
+        out = tuple(np.asarray(out[k], dtype='float64') for k in metrics)
+        return out if len(out) > 1 else out[0]
+
+    out = xr.apply_ufunc(_func,
+                         obs,
+                         mod,
+                         input_core_dims=[dims, dims],
+                         output_core_dims=[[] for _ in metrics],
+                         dask='parallelized',
+                         output_dtypes=[float for _ in metrics])
+    if len(metrics) == 1:
+        out = (out, )
+    dset = xr.Dataset({k: v for k, v in zip(metrics, out)})
+    dset.attrs['obs'] = str(obs.name)
+    dset.attrs['model'] = str(mod.name)
+    dset.attrs['reduced_dims'] = ' '.join(dims)
+    return dset
+
+
+# resampled values evaluated at once (the kernel temporaries stay in cache)
+_bootstrap_block = 2**14
+# resampled values of a bootstrap task (one seed, one process)
+_bootstrap_task = 2**22
+
+
+def _resample_index(rng, n, nboot, block=None):
+    """(nboot, n) bootstrap indices, iid or moving blocks of `block` rows."""
+    if block is None or block <= 1:
+        return rng.integers(0, n, size=(nboot, n))
+    block = min(int(block), n)
+    nblock = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(nboot, nblock))
+    index = starts[:, :, None] + np.arange(block)
+    return index.reshape(nboot, -1)[:, :n]
+
+
+def _bootstrap_chunk(o, m, metrics, nboot, block, seed):
+    """Metrics of `nboot` replicates, (nboot, metric).
+
+    The replicates are evaluated in vectorized blocks of about
+    _bootstrap_block values (one compute_stats call along axis 1 each).
+    """
+    rng = np.random.default_rng(seed)
+    per = max(1, _bootstrap_block // len(o))
+    out = []
+    for i in range(0, nboot, per):
+        index = _resample_index(rng, len(o), min(per, nboot - i), block)
+        r = compute_stats(o[index], m[index], metrics=metrics, axis=1)
+        out.append(
+            np.stack([np.asarray(r[k], dtype='float64') for k in metrics],
+                     axis=1))
+    return np.concatenate(out, axis=0)
+
+
+def _bootstrap_tasks(obs, mod, metrics, nboot, block, seed):
+    """Arguments of the _bootstrap_chunk tasks of one sample.
+
+    The replicates are split in tasks of about _bootstrap_task values, each
+    with its own spawned seed, so the replicates do not depend on the number
+    of workers.
+    """
+    o, m, valid = _paired(np.ravel(obs), np.ravel(mod))
+    if block is None or block <= 1:
+        # iid resampling of the valid pairs
+        o, m = o[valid], m[valid]
+    if len(o) == 0:
+        return []
+    per = max(1, _bootstrap_task // len(o))
+    sizes = [min(per, nboot - i) for i in range(0, nboot, per)]
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [(o, m, metrics, k, block, s)
+            for k, s in zip(sizes, seed.spawn(len(sizes)))]
+
+
+def _run_tasks(tasks, workers=None):
+    """Runs the bootstrap tasks in this process or in a process pool."""
+    if workers is None or workers == 1 or len(tasks) < 2:
+        return [_bootstrap_chunk(*i) for i in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    max_workers = None if workers < 0 else workers
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_bootstrap_chunk, *zip(*tasks)))
+
+
+def _bootstrap_summary(value, replicates, ci):
+    import warnings
+    alpha = (1. - ci) / 2. * 100.
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lower, upper = np.nanpercentile(replicates, [alpha, 100. - alpha],
+                                        axis=0)
+        std = np.nanstd(replicates, axis=0, ddof=1)
+    return {'value': value, 'lower': lower, 'upper': upper, 'std': std}
+
+
+def bootstrap_stats(obs,
+                    mod,
+                    metrics=None,
+                    nboot=1000,
+                    block=None,
+                    ci=0.95,
+                    seed=None,
+                    workers=None,
+                    return_replicates=False):
+    """Bootstrap confidence intervals of any metrics of paired data.
+
+    Resample indices are drawn in vectorized (replicate, pair) blocks and
+    compute_stats evaluates every metric of all the replicates of a block in
+    one call (axis=1).  The replicates are split in tasks spread over a
+    process pool.  Each task has its own seed spawned from `seed` (numpy
+    SeedSequence), so the replicates are reproducible and do not depend on
+    `workers`.
+
+    Parameters
+    ----------
+    obs : array-like
+        observations (numpy array with NaN or masked array).
+    mod : array-like
+        predictions.
+    metrics : list of str
+        metric names (see compute_stats).
+    nboot : int
+        number of replicates.
+    block : int
+        length of the moving blocks for autocorrelated series (ie 24 for
+        hourly data sorted in time).  None resamples the valid pairs
+        independently.
+    ci : float
+        confidence level of the percentile intervals.
+    seed : int or numpy.random.SeedSequence
+        seed of the replicates.
+    workers : int
+        number of processes.  None or 1 runs in this process, -1 uses all
+        the cores.
+    return_replicates : bool
+        also return the metrics of every replicate.
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by metric with the full sample value, the lower and upper
+        bounds of the interval and the bootstrap standard error (std).  With
+        `return_replicates`, (table, replicates) where replicates has one
+        row per replicate and one column per metric.
+
+    """
+    metrics = _check_metrics(metrics)
+    tasks = _bootstrap_tasks(obs, mod, metrics, nboot, block, seed)
+    reps = np.full((nboot, len(metrics)), np.nan)
+    if len(tasks) > 0:
+        reps = np.concatenate(_run_tasks(tasks, workers=workers), axis=0)
+    full = compute_stats(obs, mod, metrics=metrics)
+    value = np.array([full[k] for k in metrics], dtype='float64')
+    table = DataFrame(_bootstrap_summary(value, reps, ci), index=metrics)
+    table.index.name = 'metric'
+    if return_replicates:
+        return table, DataFrame(reps, columns=metrics)
+    return table
+
+
+def grouped_bootstrap_stats(df,
+                            obs='obs',
+                            mod='model',
+                            by='siteid',
+                            metrics=None,
+                            time='time',
+                            nboot=1000,
+                            block=None,
+                            ci=0.95,
+                            seed=None,
+                            workers=None):
+    """Bootstrap confidence intervals of the metrics of every group.
+
+    The tasks of all the groups go to one process pool.  With `block`, the
+    rows of each group are resampled in moving blocks in `time` order.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        paired observations and predictions.
+    obs : str
+        observation column.
+    mod : str
+        prediction column.
+    by : str or list of str
+        grouping columns or derived time keys (see grouped_stats).
+    metrics : list of str
+        metric names (see compute_stats).
+    time : str
+        time column (block order and derived time keys).
+    nboot : int
+        number of replicates per group.
+    block : int
+        length of the moving blocks.  None resamples pairs independently.
+    ci : float
+        confidence level of the percentile intervals.
+    seed : int
+        seed of the replicates.  Each group gets a spawned seed.
+    workers : int
+        number of processes.  None or 1 runs in this process, -1 uses all
+        the cores.
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per (group, metric) with the value, lower, upper and std
+        columns.
+
+    """
+    import pandas as pd
+    metrics = _check_metrics(metrics)
+    if isinstance(by, str):
+        by = [by]
+    if block is not None and time in df.columns:
+        df = df.sort_values(time, kind='stable')
+    g = _group_keys(df, by, time).groupby(by,
+                                          sort=True,
+                                          observed=True,
+                                          dropna=True)
+    groups = list(g.indices.items())
+    seeds = np.random.SeedSequence(seed).spawn(len(groups))
+    tasks = []
+    ntasks = []
+    for (key, rows), s in zip(groups, seeds):
+        t = _bootstrap_tasks(df[obs].values[rows], df[mod].values[rows],
+                             metrics, nboot, block, s)
+        tasks.extend(t)
+        ntasks.append(len(t))
+    results = _run_tasks(tasks, workers=workers)
+    out = []
+    start = 0
+    for (key, rows), k in zip(groups, ntasks):
+        reps = np.full((nboot, len(metrics)), np.nan)
+        if k > 0:
+            reps = np.concatenate(results[start:start + k], axis=0)
+        start += k
+        full = compute_stats(df[obs].values[rows],
+                             df[mod].values[rows],
+                             metrics=metrics)
+        value = np.array([full[i] for i in metrics], dtype='float64')
+        table = pd.DataFrame(_bootstrap_summary(value, reps, ci))
+        key = key if isinstance(key, tuple) else (key, )
+        for name, v in zip(by, key):
+            table[name] = v
+        table['metric'] = metrics
+        out.append(table)
+    columns = by + ['metric', 'value', 'lower', 'upper', 'std']
+    if len(out) == 0:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(out, ignore_index=True)[columns]
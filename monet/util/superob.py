@@ -0,0 +1,303 @@
+""" Binning (superobbing) of satellite swaths to model grids """
+import numpy as np
+import xarray as xr
+
+_tree_cache = {}
+
+
+def _is_rectilinear(longitude, latitude):
+    """Checks if 2D longitude and latitude describe a rectilinear grid."""
+    return bool(
+        np.allclose(longitude, longitude[0:1, :])
+        and np.allclose(latitude, latitude[:, 0:1]))
+
+
+def _centers_to_edges(centers):
+    """Cell edges from cell centers (1D)."""
+    mid = (centers[1:] + centers[:-1]) / 2.
+    first = centers[0] - (mid[0] - centers[0])
+    last = centers[-1] + (centers[-1] - mid[-1])
+    return np.concatenate([[first], mid, [last]])
+
+
+def _edges_index(edges, values):
+    """Index of the cell holding each value, -1 when outside."""
+    descending = edges[0] > edges[-1]
+    if descending:
+        edges = edges[::-1]
+    idx = np.searchsorted(edges, values, side='right') - 1
+    n = len(edges) - 1
+    idx = np.where((values >= edges[0]) & (values <= edges[-1]),
+                   np.clip(idx, 0, n - 1), -1)
+    if descending:
+        idx = np.where(idx >= 0, n - 1 - idx, -1)
+    return idx
+
+
+def _grid_tree(longitude, latitude):
+    """Cached cKDTree of the grid cell centers and the typical cell size."""
+    from .interp_util import _array_key
+    from .kdtree import get_tree, query
+    key = _array_key(longitude, latitude)
+    if key not in _tree_cache:
+        tree = get_tree(longitude, latitude)
+        # typical cell size from the spacing between neighbouring centers
+        step = max(1, longitude.shape[0] // 10)
+        d, _, _ = query(tree,
+                        longitude[::step, :].ravel(),
+                        latitude[::step, :].ravel(),
+                        k=2)
+        _tree_cache[key] = (tree, float(np.nanmedian(d[:, 1])))
+    return _tree_cache[key]
+
+
+def grid_cell_index(grid_lon, grid_lat, longitude, latitude,
+                    max_distance=None):
+    """Assigns each pixel to a grid cell.
+
+    Rectilinear grids are searched directly on the cell edges.  Curvilinear
+    grids use a (cached) KD-tree of the cell centers on the unit sphere.
+
+    Parameters
+    ----------
+    grid_lon : 2d numpy.array
+        grid longitudes (y, x).
+    grid_lat : 2d numpy.array
+        grid latitudes (y, x).
+    longitude : numpy.array
+        pixel longitudes.
+    latitude : numpy.array
+        pixel latitudes.
+    max_distance : float
+        maximum distance in meters between a pixel and the cell center on
+        curvilinear grids.  Defaults to the typical cell size.
+
+    Returns
+    -------
+    numpy.array
+        flat cell index (y * nx + x) of each pixel, -1 when the pixel is
+        outside of the grid.
+
+    """
+    from .kdtree import query
+    grid_lon = np.asarray(grid_lon, dtype='float64')
+    grid_lat = np.asarray(grid_lat, dtype='float64')
+    lon = np.asarray(longitude, dtype='float64').ravel()
+    lat = np.asarray(latitude, dtype='float64').ravel()
+    ny, nx = grid_lon.shape
+    if ny > 1 and nx > 1 and _is_rectilinear(grid_lon, grid_lat):
+        lon_edges = _centers_to_edges(grid_lon[0, :])
+        lat_edges = _centers_to_edges(grid_lat[:, 0])
+        # put the pixel longitudes in the range of the grid
+        lon = (lon - lon_edges.min()) % 360. + lon_edges.min()
+        ix = _edges_index(lon_edges, lon)
+        iy = _edges_index(lat_edges, lat)
+        return np.where((ix >= 0) & (iy >= 0), iy * nx + ix, -1)
+    tree, cell_size = _grid_tree(grid_lon, grid_lat)
+    if max_distance is None:
+        max_distance = cell_size
+    _, idx, valid = query(tree, lon, lat, radius_of_influence=max_distance)
+    return np.where(valid, idx, -1)
+
+
+class SwathBinner(object):
+    """Streaming accumulator of swath pixels on a (time, y, x) grid.
+
+    Pixels are added one granule at a time.  Only the reductions (count, sum,
+    sum of squares and weighted sums) are kept, all computed with np.bincount.
+
+    Parameters
+    ----------
+    grid : xarray.DataArray or xarray.Dataset
+        monet formatted model grid with 2D latitude and longitude.
+    times : array-like
+        model times of the output.  If None, all pixels are put in one time.
+    window : str
+        'center', 'left' or 'right' time windows around `times` (see
+        combinetool.aggregate_obs_to_model_time).
+    max_distance : float
+        maximum pixel to cell center distance in meters (curvilinear grids).
+
+    """
+
+    def __init__(self, grid, times=None, window='center', max_distance=None):
+        self.longitude = np.asarray(grid.longitude.values, dtype='float64')
+        self.latitude = np.asarray(grid.latitude.values, dtype='float64')
+        self.shape = self.longitude.shape
+        self.ncell = self.longitude.size
+        self.times = None
+        if times is not None:
+            # sorted unique times, as the time windows use them
+            self.times = np.unique(
+                np.asarray(times, dtype='datetime64[ns]').ravel())
+        self.window = window
+        self.max_distance = max_distance
+        nt = 1 if self.times is None else len(self.times)
+        size = nt * self.ncell
+        self.count = np.zeros(size)
+        self.sum = np.zeros(size)
+        self.sumsq = np.zeros(size)
+        self.wsum = np.zeros(size)
+        self.wvsum = np.zeros(size)
+        self._tmin = None
+
+    def _time_index(self, t, n):
+        from .combinetool import _model_time_index
+        if self.times is None:
+            return np.zeros(n, dtype=int), np.ones(n, dtype=bool)
+        self.times, idx, inside = _model_time_index(self.times,
+                                                    t,
+                                                    window=self.window)
+        return idx, inside
+
+    def add(self, longitude, latitude, values, time=None, weights=None):
+        """Adds the pixels of one granule.
+
+        Parameters
+        ----------
+        longitude, latitude : numpy.array
+            pixel coordinates.
+        values : numpy.array
+            pixel values, NaN are skipped.
+        time : numpy.array
+            pixel times (datetime64) broadcastable to `values`.  Needed when
+            the binner has output times.
+        weights : numpy.array
+            pixel weights for the weighted mean (ie 1 / uncertainty**2).
+
+        Returns
+        -------
+        None
+
+        """
+        values = np.asarray(values, dtype='float64')
+        shape = values.shape
+        values = values.ravel()
+        cell = grid_cell_index(self.longitude,
+                               self.latitude,
+                               np.broadcast_to(longitude, shape),
+                               np.broadcast_to(latitude, shape),
+                               max_distance=self.max_distance)
+        if time is not None:
+            time = np.broadcast_to(np.asarray(time, dtype='datetime64[ns]'),
+                                   shape).ravel()
+            tmin = time.min()
+            self._tmin = tmin if self._tmin is None else min(self._tmin, tmin)
+        elif self.times is not None:
+            raise ValueError('time is needed when the output has times')
+        tidx, inside = self._time_index(time, len(values))
+        good = (cell >= 0) & inside & np.isfinite(values)
+        if weights is not None:
+            weights = np.broadcast_to(np.asarray(weights, dtype='float64'),
+                                      shape).ravel()
+            good &= np.isfinite(weights)
+        index = tidx[good] * self.ncell + cell[good]
+        v = values[good]
+        n = len(self.count)
+        self.count += np.bincount(index, minlength=n)
+        self.sum += np.bincount(index, weights=v, minlength=n)
+        self.sumsq += np.bincount(index, weights=v * v, minlength=n)
+        if weights is not None:
+            w = weights[good]
+            self.wsum += np.bincount(index, weights=w, minlength=n)
+            self.wvsum += np.bincount(index, weights=w * v, minlength=n)
+
+    def to_dataset(self, name='superob', stats=['mean', 'count', 'std']):
+        """Returns the binned statistics as a (time, y, x) Dataset.
+
+        Parameters
+        ----------
+        name : str
+            name of the variable.  Statistics other than the mean are named
+            `name_stat` (ie aod_count).
+        stats : list of str
+            any of 'mean', 'count', 'std', 'sum' and 'weighted_mean'.
+
+        Returns
+        -------
+        xarray.Dataset
+
+        """
+        nt = len(self.count) // self.ncell
+        shape = (nt, ) + self.shape
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.sum / self.count
+            out = {
+                'mean': mean,
+                'count': self.count,
+                'sum': self.sum,
+                'std': np.sqrt(np.maximum(self.sumsq / self.count - mean**2,
+                                          0.)),
+                'weighted_mean': self.wvsum / self.wsum
+            }
+        if self.times is None:
+            times = [self._tmin] if self._tmin is not None else [0]
+        else:
+            times = self.times
+        dset = xr.Dataset(coords={
+            'time': times,
+            'latitude': (('y', 'x'), self.latitude),
+            'longitude': (('y', 'x'), self.longitude)
+        })
+        for stat in stats:
+            vname = name if stat == 'mean' else name + '_' + stat
+            dset[vname] = (('time', 'y', 'x'), out[stat].reshape(shape))
+        return dset
+
+
+def swath_to_grid(grid,
+                  granules,
+                  variable,
+                  times=None,
+                  window='center',
+                  stats=['mean', 'count', 'std'],
+                  weights=None,
+                  max_distance=None):
+    """Bins (superobs) satellite swaths onto a model grid.
+
+    Parameters
+    ----------
+    grid : xarray.DataArray or xarray.Dataset
+        monet formatted model grid with 2D latitude and longitude.
+    granules : iterable of xarray.Dataset
+        swath granules with the latitude and longitude coordinates, the
+        `variable` and optionally a `time` variable (per pixel or scanline).
+        Granules are read one at a time so a generator can stream them.
+    variable : str
+        name of the variable to bin.
+    times : array-like
+        model times of the output.  If None, all pixels go in one time.
+    window : str
+        'center', 'left' or 'right' time windows around `times`.
+    stats : list of str
+        any of 'mean', 'count', 'std', 'sum' and 'weighted_mean'.
+    weights : str
+        name of the per pixel weight variable for 'weighted_mean'.
+    max_distance : float
+        maximum pixel to cell center distance in meters (curvilinear grids).
+
+    Returns
+    -------
+    xarray.Dataset
+        (time, y, x) Dataset aligned to the model grid.
+
+    """
+    from ..monet_accessor import _dataset_to_monet, _rename_to_monet_latlon
+    if isinstance(granules, xr.Dataset):
+        granules = [granules]
+    binner = SwathBinner(_dataset_to_monet(grid),
+                         times=times,
+                         window=window,
+                         max_distance=max_distance)
+    for g in granules:
+        g = _rename_to_monet_latlon(g)
+        da = g[variable]
+        time = None
+        if 'time' in g.variables:
+            time = xr.broadcast(da, g['time'])[1].values
+        lon, lat = xr.broadcast(da, g.longitude, g.latitude)[1:]
+        w = None
+        if weights is not None:
+            w = xr.broadcast(da, g[weights])[1].values
+        binner.add(lon.values, lat.values, da.values, time=time, weights=w)
+    return binner.to_dataset(name=variable, stats=stats)
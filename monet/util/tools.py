@@ -131,42 +131,148 @@ def calc_annual_ave(df, col=None):
     return df.merge(df_annual_ave, on=['siteid', 'time_local'])
 
 
-def get_giorgi_region_bounds(index=None, acronym=None):
+# region bounds as (region, [latmin, lonmin, latmax, lonmax]), region index
+# is the row number + 1
+_giorgi_acronyms = np.array([
+    'NAU', 'SAU', 'AMZ', 'SSA', 'CAM', 'WNA', 'CNA', 'ENA', 'ALA', 'GRL', 'MED',
+    'NEU', 'WAF', 'EAF', 'SAF', 'SAH', 'SEA', 'EAS', 'SAS', 'CAS', 'TIB', 'NAS'
+])
+_giorgi_bounds = np.array([
+    [-28, 110, -11, 155], [-45, 110, -28, 155], [-20, -82, 12, -34],
+    [-56, -76, -20, -40], [10, -116, 30, -83], [30, -130, 60, -103],
+    [30, -103, 50, -85], [25, -85, 50, -60], [60, -170, 72, -103],
+    [50, -103, 85, -10], [30, -10, 48, 40], [48, -10, 75, 40],
+    [-12, -20, 18, 22], [-12, 22, 18, 52], [-35, -10, -12, 52],
+    [18, -20, 30, 65], [-11, 95, 20, 155], [20, 100, 50, 145],
+    [5, 65, 30, 100], [30, 40, 50, 75], [30, 75, 50, 100], [50, 40, 70, 180]
+], dtype='float64')
+_epa_acronyms = np.array([
+    'R1', 'R2', 'R3', 'R4', 'R5', 'R6', 'R7', 'R8', 'R9', 'R10', 'AK', 'PR',
+    'VI'
+])
+_epa_bounds = np.array(
+    [[40.9509, -73.7272, 47.455, -66.8628],
+     [38.8472, -79.7624, 45.0153, -73.8885],
+     [36.5427, -83.6753, 42.5167, -74.8526],
+     [24.3959, -91.6589, 39.1439, -75.4129],
+     [36.9894, -97.2304, 49.3877, -80.5188],
+     [25.8419, -109.0489, 37.0015, -88.7421],
+     [35.9958, -104.0543, 43.5008, -89.1005],
+     [36.9949, -116.0458, 48.9991, -96.438],
+     [31.3325, -124.6509, 42.0126, -109.0475],
+     [41.9871, -124.7305, 49.0027, -111.0471],
+     [52.5964, -169.9146, 71.5232, -129.99],
+     [17.904834, -67.289886, 18.520551, -65.177765],
+     [18.302014, -64.861221, 18.751244, -64.26384]],
+    dtype='float64')
+_region_tables = {
+    'giorgi': (_giorgi_acronyms, _giorgi_bounds),
+    'epa': (_epa_acronyms, _epa_bounds)
+}
+
+
+def _region_bounds(table, index=None, acronym=None):
+    """Row [latmin, lonmin, latmax, lonmax, acronym] of a region table."""
+    acronyms, bounds = _region_tables[table]
+    if index is not None:
+        n = int(index) - 1
+        if n < 0 or n >= len(acronyms):
+            return np.array([], dtype=object)
+    else:
+        n = np.flatnonzero(acronyms == acronym.upper())
+        if len(n) == 0:
+            return np.array([], dtype=object)
+        n = n[0]
+    out = np.empty(5, dtype=object)
+    out[:4] = bounds[n].tolist()
+    out[4] = str(acronyms[n])
+    return out
+
+
+def region_index(latitude, longitude, table='giorgi'):
+    """Vectorized bounding box region lookup.
+
+    All points are compared with all regions of the table in one broadcast.
+    Where regions overlap the region with the highest index wins, which is
+    the result of the per region loops of get_giorgi_region_df and
+    get_epa_region_df.
+
+    Parameters
+    ----------
+    latitude : array-like
+        point latitudes.
+    longitude : array-like
+        point longitudes.
+    table : str
+        'giorgi' or 'epa'.
+
+    Returns
+    -------
+    numpy.array
+        region index (starting at 1) of each point, 0 outside of all the
+        regions.
+
+    """
+    _, bounds = _region_tables[table]
+    lat = np.asarray(latitude, dtype='float64')[..., None]
+    lon = np.asarray(longitude, dtype='float64')[..., None]
+    inside = ((lat >= bounds[:, 0]) & (lon >= bounds[:, 1])
+              & (lat <= bounds[:, 2]) & (lon <= bounds[:, 3]))
+    n = bounds.shape[0]
+    last = n - np.argmax(inside[..., ::-1], axis=-1)
+    return np.where(inside.any(axis=-1), last, 0)
+
+
+def _region_df(df, table, prefix):
     import pandas as pd
-    i = [
-        1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
-        21, 22
-    ]
-    acro = [
-        'NAU', 'SAU', 'AMZ', 'SSA', 'CAM', 'WNA', 'CNA', 'ENA', 'ALA', 'GRL',
-        'MED', 'NEU', 'WAF', 'EAF', 'SAF', 'SAH', 'SEA', 'EAS', 'SAS', 'CAS',
-        'TIB', 'NAS'
-    ]
-    lonmax = [
-        155, 155, -34, -40, -83, -103, -85, -60, -103, -10, 40, 40, 22, 52, 52,
-        65, 155, 145, 100, 75, 100, 180
-    ]
-    lonmin = [
-        110, 110, -82, -76, -116, -130, -103, -85, -170, -103, -10, -10, -20,
-        22, -10, -20, 95, 100, 65, 40, 75, 40
-    ]
-    latmax = [
-        -11, -28, 12, -20, 30, 60, 50, 50, 72, 85, 48, 75, 18, 18, -12, 30, 20,
-        50, 30, 50, 50, 70
-    ]
-    latmin = [
-        -28, -45, -20, -56, 10, 30, 30, 25, 60, 50, 30, 48, -12, -12, -35, 18,
-        -11, 20, 5, 30, 30, 50
-    ]
-    df = pd.DataFrame(
-        {
-            'latmin': latmin,
-            'lonmin': lonmin,
-            'latmax': latmax,
-            'lonmax': lonmax,
-            'acronym': acro
-        },
-        index=i)
+    acronyms, _ = _region_tables[table]
+    idx = region_index(df.latitude.values, df.longitude.values, table=table)
+    df.loc[:, prefix + '_INDEX'] = pd.array(np.where(idx > 0, idx, None),
+                                            dtype='Int64')
+    df.loc[:, prefix + '_ACRO'] = pd.Categorical.from_codes(
+        idx - 1, categories=acronyms)
+    return df
+
+
+def region_index_da(dset, table='giorgi', name=None):
+    """Region index of the cells of an xarray object as a coordinate.
+
+    The lookup is done with xarray.apply_ufunc so dask backed latitude and
+    longitude stay lazy.
+
+    Parameters
+    ----------
+    dset : xarray.DataArray or xarray.Dataset
+        object with the latitude and longitude coordinates.
+    table : str
+        'giorgi' or 'epa'.
+    name : str
+        name of the coordinate.  Defaults to GIORGI_INDEX or EPA_INDEX.
+
+    Returns
+    -------
+    xarray.DataArray or xarray.Dataset
+        `dset` with the region index coordinate (0 outside of the regions)
+        and the acronyms in the flag_meanings attribute.
+
+    """
+    import xarray as xr
+    if name is None:
+        name = table.upper() + '_INDEX'
+    lat, lon = xr.broadcast(dset.latitude, dset.longitude)
+    idx = xr.apply_ufunc(region_index,
+                         lat,
+                         lon,
+                         kwargs={'table': table},
+                         dask='parallelized',
+                         output_dtypes=[int])
+    acronyms, _ = _region_tables[table]
+    idx.attrs['flag_values'] = np.arange(1, len(acronyms) + 1)
+    idx.attrs['flag_meanings'] = ' '.join(acronyms)
+    return dset.assign_coords({name: idx})
+
+
+def get_giorgi_region_bounds(index=None, acronym=None):
     try:
         if index is None and acronym is None:
             print('either index or acronym needs to be supplied')
@@ -174,59 +280,30 @@ def get_giorgi_region_bounds(index=None, acronym=None):
                 'look here https://web.northeastern.edu/sds/web/demsos/images_002/subregions.jpg'
             )
             raise ValueError
-        elif index is not None:
-            return df.loc[df.index == index].values.flatten()
-        else:
-            return df.loc[df.acronym == acronym.upper()].values.flatten()
+        return _region_bounds('giorgi', index=index, acronym=acronym)
     except ValueError:
         exit
 
 
 def get_giorgi_region_df(df):
-    df.loc[:, 'GIORGI_INDEX'] = None
-    df.loc[:, 'GIORGI_ACRO'] = None
-    for i in range(22):
-        latmin, lonmin, latmax, lonmax, acro = get_giorgi_region_bounds(
-            index=int(i + 1))
-        con = (df.longitude <= lonmax) & (df.longitude >= lonmin) & (
-            df.latitude <= latmax) & (df.latitude >= latmin)
-        df.loc[con, 'GIORGI_INDEX'] = i + 1
-        df.loc[con, 'GIORGI_ACRO'] = acro
-    return df
+    """Adds the GIORGI_INDEX (Int64) and GIORGI_ACRO (categorical) columns
+    from the bounding boxes of the regions (see region_index).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame with the latitude and longitude columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        `df` with the region columns, missing outside of the regions.
+
+    """
+    return _region_df(df, 'giorgi', 'GIORGI')
 
 
 def get_epa_region_bounds(index=None, acronym=None):
-    import pandas as pd
-    i = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
-    acro = [
-        'R1', 'R2', 'R3', 'R4', 'R5', 'R6', 'R7', 'R8', 'R9', 'R10', 'AK',
-        'PR', 'VI'
-    ]
-    lonmax = [
-        -66.8628, -73.8885, -74.8526, -75.4129, -80.5188, -88.7421, -89.1005,
-        -96.438, -109.0475, -111.0471, -129.99, -65.177765, -64.26384
-    ]
-    lonmin = [
-        -73.7272, -79.7624, -83.6753, -91.6589, -97.2304, -109.0489, -104.0543,
-        -116.0458, -124.6509, -124.7305, -169.9146, -67.289886, -64.861221
-    ]
-    latmax = [
-        47.455, 45.0153, 42.5167, 39.1439, 49.3877, 37.0015, 43.5008, 48.9991,
-        42.0126, 49.0027, 71.5232, 18.520551, 18.751244
-    ]
-    latmin = [
-        40.9509, 38.8472, 36.5427, 24.3959, 36.9894, 25.8419, 35.9958, 36.9949,
-        31.3325, 41.9871, 52.5964, 17.904834, 18.302014
-    ]
-    df = pd.DataFrame(
-        {
-            'latmin': latmin,
-            'lonmin': lonmin,
-            'latmax': latmax,
-            'lonmax': lonmax,
-            'acronym': acro
-        },
-        index=i)
     try:
         if index is None and acronym is None:
             print('either index or acronym needs to be supplied')
@@ -235,22 +312,24 @@ def get_epa_region_bounds(index=None, acronym=None):
                 'https://gist.github.com/jakebathman/719e8416191ba14bb6e700fc2d5fccc5'
             )
             raise ValueError
-        elif index is not None:
-            return df.loc[df.index == index].values.flatten()
-        else:
-            return df.loc[df.acronym == acronym.upper()].values.flatten()
+        return _region_bounds('epa', index=index, acronym=acronym)
     except ValueError:
         exit
 
 
 def get_epa_region_df(df):
-    df.loc[:, 'EPA_INDEX'] = None
-    df.loc[:, 'EPA_ACRO'] = None
-    for i in range(13):
-        latmin, lonmin, latmax, lonmax, acro = get_epa_region_bounds(
-            index=int(i + 1))
-        con = (df.longitude <= lonmax) & (df.longitude >= lonmin) & (
-            df.latitude <= latmax) & (df.latitude >= latmin)
-        df.loc[con, 'EPA_INDEX'] = i + 1
-        df.loc[con, 'EPA_ACRO'] = acro
-    return df
+    """Adds the EPA_INDEX (Int64) and EPA_ACRO (categorical) columns
+    from the bounding boxes of the regions (see region_index).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame with the latitude and longitude columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        `df` with the region columns, missing outside of the regions.
+
+    """
+    return _region_df(df, 'epa', 'EPA')
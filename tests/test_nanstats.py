@@ -0,0 +1,60 @@
+import inspect
+
+import numpy as np
+import pytest
+
+from monet.util import nanstats, stats
+
+# stats functions of (obs, mod, axis) that are not metrics
+_not_metrics = ['compute_stats', 'matchedcompressed', 'matchmasks']
+
+
+def _metric_names():
+    names = []
+    for name, func in inspect.getmembers(stats, inspect.isfunction):
+        if name.startswith('_') or name in _not_metrics:
+            continue
+        if func.__module__ != stats.__name__:
+            continue
+        if list(inspect.signature(func).parameters)[:3] == [
+                'obs', 'mod', 'axis'
+        ]:
+            names.append(name)
+    return names
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    obs = rng.gamma(2., 100., (20, 30))
+    mod = obs * 1.1 + rng.normal(0., 50., obs.shape)
+    return obs, mod
+
+
+def test_drop_in_names():
+    missing = [i for i in _metric_names() if not hasattr(nanstats, i)]
+    assert missing == []
+
+
+@pytest.mark.parametrize('name', _metric_names())
+def test_same_values(name):
+    # complete data: the wind direction _m versions of stats drop the masks
+    obs, mod = _data()
+    for axis in [None, 0]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = np.ma.filled(
+                getattr(stats, name)(np.ma.asarray(obs), np.ma.asarray(mod),
+                                     axis=axis), np.nan)
+            value = getattr(nanstats, name)(obs, mod, axis=axis)
+        np.testing.assert_allclose(value, expected, rtol=1e-9,
+                                   equal_nan=True, err_msg=name)
+
+
+def test_missing_values():
+    obs, mod = _data()
+    obs[0, :5] = np.nan
+    o, m = stats.matchmasks(np.ma.masked_invalid(obs),
+                            np.ma.masked_invalid(mod))
+    for name in ['MB', 'RMSE', 'NMB', 'IOA', 'MdnB', 'NME_m_ABS']:
+        expected = np.ma.filled(getattr(stats, name)(o, m, axis=1), np.nan)
+        np.testing.assert_allclose(getattr(nanstats, name)(obs, mod, axis=1),
+                                   expected, rtol=1e-9, err_msg=name)
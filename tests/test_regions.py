@@ -0,0 +1,37 @@
+import numpy as np
+
+from monet.util.regions import RegionSet
+
+
+def test_dateline_bounds():
+    regions = RegionSet.from_bounds(['pac'], [170], [50], [190], [60])
+    np.testing.assert_array_equal(regions.bounds, [[170, 50, 190, 60]])
+    lon = np.array([175, -175, 0, -100, 100, 185, -185.])
+    codes = regions.codes(lon, np.full(lon.shape, 55.))
+    np.testing.assert_array_equal(codes, [0, 0, -1, -1, -1, 0, 0])
+    # lonmax < lonmin is the same box
+    other = RegionSet.from_bounds(['pac'], [170], [50], [-170], [60])
+    np.testing.assert_array_equal(other.codes(lon, np.full(lon.shape, 55.)),
+                                  codes)
+
+
+def test_dateline_geojson():
+    feature = {
+        'type': 'Feature',
+        'properties': {
+            'name': 'pac'
+        },
+        'geometry': {
+            'type':
+            'Polygon',
+            'coordinates': [[[160, 0], [230, 0], [230, 10], [160, 10],
+                             [160, 0]],
+                            [[200, 2], [210, 2], [210, 4], [200, 4],
+                             [200, 2]]]
+        }
+    }
+    regions = RegionSet.from_geojson(feature)
+    lon = np.array([165, -170, -140, -125, 150, -155.])
+    lat = np.array([5, 5, 5, 5, 5, 3.])
+    np.testing.assert_array_equal(regions.codes(lon, lat),
+                                  [0, 0, 0, -1, -1, -1])
@@ -0,0 +1,59 @@
+import numpy as np
+
+from monet.util.stats import StatsAccumulator, compute_stats, moment_metrics
+
+
+def _chunks():
+    rng = np.random.default_rng(0)
+    obs = rng.gamma(2., 10., 3000)
+    mod = obs * 1.1 + rng.normal(0., 5., obs.size)
+    obs[::17] = np.nan
+    return obs, mod, [slice(0, 1000), slice(1000, 2000), slice(2000, 3000)]
+
+
+def test_accumulator_merge_is_associative():
+    obs, mod, parts = _chunks()
+    a, b, c = [StatsAccumulator().update(obs[i], mod[i]) for i in parts]
+    left = ((a + b) + c).result(moment_metrics)
+    right = (a + (b + c)).result(moment_metrics)
+    single = compute_stats(obs, mod, moment_metrics)
+    for name in moment_metrics:
+        np.testing.assert_allclose(left[name], right[name], err_msg=name)
+        if name in ['d1', 'E1', 'IOA']:
+            # the chunks have different references
+            assert np.isnan(left[name])
+        else:
+            np.testing.assert_allclose(left[name], single[name],
+                                       err_msg=name)
+
+
+def test_accumulator_shared_reference():
+    obs, mod, parts = _chunks()
+    ref = np.nanmean(obs)
+    accs = [StatsAccumulator(obs_ref=ref).update(obs[i], mod[i])
+            for i in parts]
+    out = ((accs[0] + accs[1]) + accs[2]).result(['d1', 'E1', 'IOA', 'AC'])
+    single = compute_stats(obs, mod, ['d1', 'E1', 'IOA', 'AC'])
+    for name, value in out.items():
+        np.testing.assert_allclose(value, single[name], err_msg=name)
+
+
+def test_accumulator_empty_first_chunk():
+    obs, mod, _ = _chunks()
+    acc = StatsAccumulator().update(np.full(10, np.nan), np.full(10, np.nan))
+    out = acc.update(obs, mod).result(['IOA'])
+    np.testing.assert_allclose(out['IOA'], compute_stats(obs, mod,
+                                                         ['IOA'])['IOA'])
+
+
+def test_accumulator_round_trip():
+    obs, mod, parts = _chunks()
+    a, b = [StatsAccumulator().update(obs[i], mod[i]) for i in parts[:2]]
+    merged = a + b
+    again = StatsAccumulator.from_dict(merged.to_dict()) + StatsAccumulator(
+    ).update(obs[parts[2]], mod[parts[2]])
+    out = again.result(['AC', 'IOA', 'R'])
+    single = compute_stats(obs, mod, ['AC', 'R'])
+    assert np.isnan(out['IOA'])
+    np.testing.assert_allclose(out['AC'], single['AC'])
+    np.testing.assert_allclose(out['R'], single['R'])